@@ -1,16 +1,35 @@
 from flask import Flask, render_template, request, redirect, url_for, flash
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import make_transient_to_detached, object_session
 from email_validator import validate_email, EmailNotValidError
 import os
+import hashlib
+import sqlite_profile
+from user_cache import UserCache
+from password_pool import PasswordPool, PasswordPoolError
+from password_policy import PasswordPolicy
+from secret_keys import load_secret_keys
+from page_cache import FragmentCacheExtension, RenderCache, render_cached
+from template_cache import install_bytecode_cache, precompile_templates
+from rate_limit import RateLimiter, api_key, client_ip, create_store, form_username, parse_rate
 
 app = Flask(__name__)
-app.config['SECRET_KEY'] = os.urandom(24)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
+# Clés de signature partagées par tous les processus (SECRET_KEY ou fichier de clés),
+# les anciennes clés restent acceptées après une rotation (python secret_keys.py rotate)
+app.config['SECRET_KEY'], app.config['SECRET_KEY_FALLBACKS'] = load_secret_keys(
+    os.getenv('SECRET_KEY_FILE', os.path.join(app.instance_path, 'secret_key'))
+)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('FLASK_DATABASE_URI', 'sqlite:///users.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool adapté au serveur multi-thread ; pragmas (WAL, busy_timeout...) appliqués à chaque connexion
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_profile.engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 
 db = SQLAlchemy(app)
+with app.app_context():
+    sqlite_profile.install(db.engine)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -23,15 +42,178 @@ class User(UserMixin, db.Model):
     role = db.Column(db.String(20), default='member')  # owner, admin, moderator, member
     discord_id = db.Column(db.String(50), unique=True, nullable=True)
 
+# Hachage et vérification des mots de passe hors des threads du serveur
+password_pool = PasswordPool(
+    workers=int(os.getenv('PASSWORD_POOL_WORKERS', '0')) or None,  # 0 = nombre de CPU
+    max_queue=int(os.getenv('PASSWORD_POOL_MAX_QUEUE', '64')),
+    timeout=float(os.getenv('PASSWORD_POOL_TIMEOUT', '5')),
+    use_processes=os.getenv('PASSWORD_POOL_KIND', 'thread') == 'process'
+)
+
+# Méthode de hachage : imposée (PASSWORD_HASH_METHOD, ex: pbkdf2:sha256:600000)
+# ou calibrée au démarrage pour une vérification d'environ PASSWORD_HASH_TARGET_MS
+if os.getenv('PASSWORD_HASH_METHOD'):
+    password_policy = PasswordPolicy(os.getenv('PASSWORD_HASH_METHOD'))
+else:
+    password_policy = PasswordPolicy.calibrated(
+        algorithm=os.getenv('PASSWORD_HASH_ALGORITHM', 'pbkdf2'),
+        target_ms=float(os.getenv('PASSWORD_HASH_TARGET_MS', '250')),
+        min_iterations=int(os.getenv('PASSWORD_HASH_MIN_ITERATIONS', '100000'))
+    )
+
+# Message si le pool de hachage est saturé
+BUSY_MESSAGE = 'Serveur surchargé, veuillez réessayer dans quelques instants'
+
+# Pages et fragments de gabarits rendus, par utilisateur et version du contenu (CONTENT_VERSION)
+page_cache = RenderCache(
+    max_entries=int(os.getenv('PAGE_CACHE_SIZE', '512')),
+    max_bytes=int(os.getenv('PAGE_CACHE_MAX_BYTES', str(16 * 1024 * 1024))),
+    version=os.getenv('CONTENT_VERSION', ''),
+    default_ttl=float(os.getenv('PAGE_CACHE_TTL', '300')) or None  # 0 = pas d'expiration
+)
+app.jinja_env.add_extension(FragmentCacheExtension)
+app.jinja_env.fragment_cache = page_cache
+
+# Code compilé des gabarits gardé sur disque (JINJA_CACHE_DIR vide = désactivé)
+JINJA_CACHE_DIR = os.getenv('JINJA_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache'))
+if JINJA_CACHE_DIR:
+    install_bytecode_cache(app, JINJA_CACHE_DIR)
+
+@app.cli.command('precompile-templates')
+def precompile_templates_command():
+    """Compile tous les gabarits (remplit le cache de bytecode) et affiche les durées"""
+    timings = precompile_templates(app)
+    for name, elapsed in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"{elapsed:8.1f} ms  {name}")
+    print(f"{sum(timings.values()):8.1f} ms  total ({len(timings)} gabarits)")
+
+# Gabarits partagés par tous les utilisateurs d'un même rôle (séparés par des virgules).
+# À réserver aux gabarits sans aucune donnée personnelle : les autres pages
+# authentifiées sont mises en cache par utilisateur.
+PAGE_CACHE_ROLE_TEMPLATES = {
+    name.strip() for name in os.getenv('PAGE_CACHE_ROLE_TEMPLATES', '').split(',') if name.strip()
+}
+
+# Colonnes dont l'état fait partie de la clé des pages d'un utilisateur
+PAGE_SCOPE_COLUMNS = [column.key for column in User.__table__.columns if column.key != 'password']
+
+def page_scope(template: str) -> str:
+    """
+    Portée d'une page en cache : visiteur anonyme, rôle (sur demande) ou
+    utilisateur et état de sa ligne ; une modification du profil ou du rôle,
+    faite dans n'importe quel worker, change la clé de ses pages.
+    """
+    if not current_user.is_authenticated:
+        return 'anonymous'
+    if template in PAGE_CACHE_ROLE_TEMPLATES:
+        return f'role:{current_user.role}'
+    row = repr([getattr(current_user, column) for column in PAGE_SCOPE_COLUMNS])
+    return f'user:{current_user.id}:{hashlib.sha256(row.encode("utf-8")).hexdigest()[:16]}'
+
+# Limitation du débit des connexions et inscriptions. RATE_LIMIT_STORE=sqlite:<chemin>
+# partage les compteurs entre les workers d'une même machine (défaut en --serve production)
+if os.getenv('SERVE_MODE') == 'production':
+    DEFAULT_RATE_LIMIT_STORE = 'sqlite:' + os.path.join(app.instance_path, 'rate_limit.db')
+else:
+    DEFAULT_RATE_LIMIT_STORE = 'memory'
+rate_limiter = RateLimiter(
+    create_store(os.getenv('RATE_LIMIT_STORE', DEFAULT_RATE_LIMIT_STORE)),
+    enabled=os.getenv('RATE_LIMIT_ENABLED', '1') == '1'
+)
+
+# Règles par point d'accès : débits "nombre/secondes"
+LOGIN_RULES = [
+    ('ip', client_ip, *parse_rate(os.getenv('RATE_LIMIT_LOGIN_IP', '20/60'))),
+    ('user', form_username, *parse_rate(os.getenv('RATE_LIMIT_LOGIN_USER', '5/60'))),
+]
+REGISTER_RULES = [
+    ('ip', client_ip, *parse_rate(os.getenv('RATE_LIMIT_REGISTER_IP', '5/300'))),
+]
+API_REGISTER_RULES = [
+    ('ip', client_ip, *parse_rate(os.getenv('RATE_LIMIT_API_IP', '30/60'))),
+    ('key', api_key, *parse_rate(os.getenv('RATE_LIMIT_API_KEY', '60/60'))),
+]
+
+# Message d'erreur par colonne unique de la table user
+UNIQUE_MESSAGES = {
+    'discord_id': 'Ce compte Discord est déjà enregistré',
+    'username': 'Ce nom d\'utilisateur est déjà pris',
+    'email': 'Cette adresse email est déjà utilisée',
+}
+
+def unique_violation(error: IntegrityError):
+    """Colonne unique violée, d'après le message de la base (SQLite, PostgreSQL, MySQL)"""
+    message = str(error.orig)
+    return next((column for column in UNIQUE_MESSAGES if column in message), None)
+
+def create_user(user: User):
+    """
+    Insère un utilisateur en un seul aller-retour : l'unicité est garantie par
+    les contraintes de la base, sans SELECT préalable ni fenêtre de course.
+    Retourne None si le compte est créé, sinon le message d'erreur à afficher.
+    """
+    db.session.add(user)
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return UNIQUE_MESSAGES.get(unique_violation(e), 'Ce compte existe déjà')
+    return None
+
+# Utilisateurs connectés gardés en mémoire entre les requêtes (USER_CACHE_TTL = 0 pour désactiver)
+user_cache = UserCache(
+    max_entries=int(os.getenv('USER_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('USER_CACHE_TTL', '60')),
+    # Invalidations partagées par les workers (USER_CACHE_SHARED_FILE vide = par processus)
+    shared_file=os.getenv('USER_CACHE_SHARED_FILE', os.path.join(app.instance_path, 'user_cache.gen')) or None
+)
+
+def detached_copy(user: User) -> User:
+    """Copie de la ligne, détachée de toute session, pour le cache des utilisateurs"""
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def user_changed(mapper, connection, target):
+    # Invalidé tout de suite dans ce processus, puis à nouveau à la validation
+    # (pour tous les workers) : une requête concurrente a pu remettre
+    # l'ancienne ligne en cache entre les deux
+    user_cache.invalidate(target.id, shared=False)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_users', set()).add(target.id)
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_changed_users(session):
+    changed_users = session.info.pop('changed_users', ())
+    if changed_users:
+        user_cache.invalidate(*changed_users)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def forget_changed_users(session, previous_transaction):
+    session.info.pop('changed_users', None)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        # Rattache la copie à la session de la requête sans requête SQL
+        return db.session.merge(cached, load=False)
+
+    user = db.session.get(User, user_id)
+    if user is not None:
+        user_cache.set(user_id, detached_copy(user))
+    return user
 
 @app.route('/')
 def home():
-    return render_template('index.html')
+    return render_cached(page_cache, 'index.html', page_scope('index.html'))
 
 @app.route('/register', methods=['GET', 'POST'])
+@rate_limiter.limit('register', REGISTER_RULES)
 def register():
     if request.method == 'POST':
         username = request.form.get('username')
@@ -54,20 +236,18 @@ def register():
             flash('Adresse email invalide', 'error')
             return redirect(url_for('register'))
 
-        if User.query.filter_by(username=username).first():
-            flash('Ce nom d\'utilisateur est déjà pris', 'error')
-            return redirect(url_for('register'))
-
-        if User.query.filter_by(email=email).first():
-            flash('Cette adresse email est déjà utilisée', 'error')
+        # Création du nouvel utilisateur (doublons détectés par la base)
+        try:
+            hashed_password = password_pool.hash(password, method=password_policy.method)
+        except PasswordPoolError:
+            flash(BUSY_MESSAGE, 'error')
             return redirect(url_for('register'))
-
-        # Création du nouvel utilisateur
-        hashed_password = generate_password_hash(password, method='sha256')
         new_user = User(username=username, email=email, password=hashed_password)
         
-        db.session.add(new_user)
-        db.session.commit()
+        error = create_user(new_user)
+        if error:
+            flash(error, 'error')
+            return redirect(url_for('register'))
 
         flash('Inscription réussie ! Vous pouvez maintenant vous connecter.', 'success')
         return redirect(url_for('login'))
@@ -75,6 +255,7 @@ def register():
     return render_template('register.html')
 
 @app.route('/login', methods=['GET', 'POST'])
+@rate_limiter.limit('login', LOGIN_RULES)
 def login():
     if request.method == 'POST':
         username = request.form.get('username')
@@ -83,10 +264,24 @@ def login():
 
         user = User.query.filter_by(username=username).first()
 
-        if not user or not check_password_hash(user.password, password):
+        try:
+            valid = user is not None and password_pool.verify(user.password, password)
+        except PasswordPoolError:
+            flash(BUSY_MESSAGE, 'error')
+            return redirect(url_for('login'))
+
+        if not valid:
             flash('Nom d\'utilisateur ou mot de passe incorrect', 'error')
             return redirect(url_for('login'))
 
+        # Hachage plus faible que la politique actuelle : refait avec le mot de passe en clair
+        if password_policy.needs_rehash(user.password):
+            try:
+                user.password = password_pool.hash(password, method=password_policy.method)
+                db.session.commit()
+            except PasswordPoolError:
+                pass  # Refait à une prochaine connexion
+
         login_user(user, remember=remember)
         return redirect(url_for('dashboard'))  # Redirige vers le dashboard approprié
 
@@ -104,6 +299,7 @@ def logout():
     return redirect(url_for('home'))
 
 @app.route('/api/discord/register', methods=['POST'])
+@rate_limiter.limit('discord_register', API_REGISTER_RULES)
 def discord_register():
     data = request.get_json()
     
@@ -112,18 +308,11 @@ def discord_register():
     if not all(field in data for field in required_fields):
         return {'error': 'Tous les champs sont requis'}, 400
     
-    # Vérifier si l'utilisateur existe déjà
-    if User.query.filter_by(discord_id=data['discord_id']).first():
-        return {'error': 'Ce compte Discord est déjà enregistré'}, 400
-    
-    if User.query.filter_by(username=data['username']).first():
-        return {'error': 'Ce nom d\'utilisateur est déjà pris'}, 400
-    
-    if User.query.filter_by(email=data['email']).first():
-        return {'error': 'Cette adresse email est déjà utilisée'}, 400
-    
-    # Créer le nouvel utilisateur
-    hashed_password = generate_password_hash(data['password'], method='sha256')
+    # Créer le nouvel utilisateur (doublons détectés par la base)
+    try:
+        hashed_password = password_pool.hash(data['password'], method=password_policy.method)
+    except PasswordPoolError:
+        return {'error': BUSY_MESSAGE}, 503, {'Retry-After': '1'}
     new_user = User(
         username=data['username'],
         email=data['email'],
@@ -132,11 +321,105 @@ def discord_register():
         role=data['role']
     )
     
-    db.session.add(new_user)
-    db.session.commit()
+    error = create_user(new_user)
+    if error:
+        return {'error': error}, 400
     
     return {'message': 'Compte créé avec succès'}, 201
 
+# Nombre maximal de comptes par appel à l'enregistrement groupé
+BATCH_REGISTER_MAX = int(os.getenv('BATCH_REGISTER_MAX', '500'))
+
+@app.route('/api/discord/register/batch', methods=['POST'])
+@rate_limiter.limit('discord_register', API_REGISTER_RULES)
+def discord_register_batch():
+    """
+    Enregistre une promotion de comptes Discord en une seule transaction.
+
+    Corps attendu: {"users": [{username, password, discordId, role, email?}, ...]}
+    Les doublons (dans le lot ou en base) sont vérifiés en trois requêtes pour
+    tout le lot ; la réponse contient le résultat de chaque utilisateur.
+    """
+    api_key = os.getenv('API_KEY')
+    if api_key and request.headers.get('Authorization') != f'Bearer {api_key}':
+        return {'error': 'Non autorisé'}, 401
+
+    data = request.get_json(silent=True) or {}
+    users = data.get('users')
+    if not isinstance(users, list) or not users:
+        return {'error': 'La liste des utilisateurs est requise'}, 400
+    if len(users) > BATCH_REGISTER_MAX:
+        return {'error': f'Maximum {BATCH_REGISTER_MAX} utilisateurs par lot'}, 400
+
+    entries = []
+    for item in users:
+        item = item if isinstance(item, dict) else {}
+        username = item.get('username')
+        entries.append({
+            'username': username,
+            'email': item.get('email') or (f'{username}@discord.app' if username else None),
+            'password': item.get('password'),
+            'discord_id': str(item.get('discord_id') or item.get('discordId') or '') or None,
+            'role': (item.get('role') or 'member').lower(),
+        })
+
+    # Valeurs déjà présentes en base, une requête par colonne unique
+    taken = {
+        column: {
+            value for (value,) in db.session.query(getattr(User, column)).filter(
+                getattr(User, column).in_({entry[column] for entry in entries if entry[column]})
+            )
+        }
+        for column in ('discord_id', 'username', 'email')
+    }
+
+    results = []
+    accepted = []
+    for entry in entries:
+        result = {'discordId': entry['discord_id'], 'username': entry['username']}
+        if not all(entry[field] for field in ('username', 'password', 'discord_id')):
+            result.update(status='error', error='Tous les champs sont requis')
+        else:
+            conflict = next((column for column in ('discord_id', 'username', 'email')
+                             if entry[column] in taken[column]), None)
+            if conflict:
+                result.update(status='error', error=UNIQUE_MESSAGES[conflict])
+            else:
+                # Réserver les valeurs pour détecter les doublons à l'intérieur du lot
+                for column in taken:
+                    taken[column].add(entry[column])
+                accepted.append(entry)
+                result['status'] = 'created'
+        results.append(result)
+
+    try:
+        hashes = password_pool.hash_many([entry['password'] for entry in accepted], method=password_policy.method)
+    except PasswordPoolError:
+        return {'error': BUSY_MESSAGE}, 503, {'Retry-After': '5'}
+
+    db.session.add_all(
+        User(
+            username=entry['username'],
+            email=entry['email'],
+            password=password_hash,
+            discord_id=entry['discord_id'],
+            role=entry['role']
+        )
+        for entry, password_hash in zip(accepted, hashes)
+    )
+
+    created = len(accepted)
+    if created:
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            # Compte créé entre la vérification et l'insertion : le lot entier est annulé
+            db.session.rollback()
+            message = UNIQUE_MESSAGES.get(unique_violation(e), 'Ce compte existe déjà')
+            return {'error': f'{message} (lot annulé, veuillez réessayer)'}, 409
+
+    return {'created': created, 'failed': len(results) - created, 'results': results}, 200
+
 # Redirection en fonction du rôle après connexion
 @app.route('/dashboard')
 @login_required
@@ -156,7 +439,7 @@ def dashboard():
 def admin_dashboard():
     if current_user.role not in ['admin', 'owner']:
         return redirect(url_for('profile'))
-    return render_template('admin/dashboard.html')
+    return render_cached(page_cache, 'admin/dashboard.html', page_scope('admin/dashboard.html'))
 
 # Exemple de route pour le panel modo
 @app.route('/moderator')
@@ -164,16 +447,35 @@ def admin_dashboard():
 def moderator_dashboard():
     if current_user.role not in ['moderator', 'admin', 'owner']:
         return redirect(url_for('profile'))
-    return render_template('moderator/dashboard.html')
+    return render_cached(page_cache, 'moderator/dashboard.html', page_scope('moderator/dashboard.html'))
+
+# Métriques internes du serveur (admin uniquement)
+@app.route('/admin/metrics')
+@login_required
+def admin_metrics():
+    if current_user.role not in ['admin', 'owner']:
+        return {'error': 'Accès refusé'}, 403
+    return {
+        'user_cache': user_cache.stats(),
+        'password_pool': password_pool.stats(),
+        'page_cache': page_cache.stats(),
+        'rate_limiter': rate_limiter.stats(),
+    }
 
 # Exemple de route pour le panel membre
 @app.route('/member')
 @login_required
 def member_dashboard():
-    return render_template('member/dashboard.html')
+    return render_cached(page_cache, 'member/dashboard.html', page_scope('member/dashboard.html'))
+
 
+# Préchargement des gabarits au démarrage (TEMPLATE_WARMUP=1) ; en production les
+# workers forkés héritent des gabarits déjà chargés
+if os.getenv('TEMPLATE_WARMUP', '0') == '1':
+    precompile_templates(app)
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
     app.run(debug=True, load_dotenv=False, port=3000)  # Port 3000 pour correspondre à l'API attendue
+
@@ -0,0 +1,251 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from audit_log import action_code, open_segment, parse_legacy_line, segments_for_range
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    indexed_bytes INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS postings (
+    file_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    user_id INTEGER,
+    guild_id INTEGER,
+    action TEXT NOT NULL,
+    derived INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS postings_user ON postings (user_id, ts);
+CREATE INDEX IF NOT EXISTS postings_guild ON postings (guild_id, action, ts);
+CREATE INDEX IF NOT EXISTS postings_action ON postings (action, ts);
+"""
+
+# Nombre d'enregistrements insérés par transaction lors du rattrapage
+CATCH_UP_BATCH = 5000
+
+# Codes d'action secondaires d'un événement groupé, selon ses détails
+# (un "Rôles modifiés" est aussi trouvé par role_added et/ou role_removed)
+DERIVED_ACTIONS = {
+    'roles_changed': (('roles_ajoutes', 'role_added'), ('roles_retires', 'role_removed')),
+}
+
+
+def derived_actions(code: str, event: dict) -> List[str]:
+    """Codes d'action secondaires sous lesquels un événement est aussi indexé"""
+    details = event.get('details') or {}
+    return [derived for key, derived in DERIVED_ACTIONS.get(code, ()) if details.get(key)]
+
+
+class AuditIndex:
+    """
+    Index inversé du journal d'audit (bot.log et ses segments).
+
+    Associe l'utilisateur, le serveur et le code d'action de chaque événement
+    à sa position (fichier, décalage en octets). L'index est alimenté au fil
+    des écritures de l'AuditLogWriter et suit les renommages dus à la rotation
+    et à la compression ; seul ce qui a été écrit hors du bot est rattrapé au
+    démarrage.
+    """
+
+    def __init__(self, path: str = 'bot.log.index.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+        self._file_ids: Dict[str, int] = {}
+
+    def _migrate(self):
+        """Index créé avant les codes secondaires : vidé, puis reconstruit par catch_up()"""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(postings)")]
+        if columns and 'derived' not in columns:
+            with self._conn:
+                self._conn.execute("DROP TABLE postings")
+                self._conn.execute("DELETE FROM files")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _file_id(self, path: str) -> int:
+        file_id = self._file_ids.get(path)
+        if file_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO files (path) VALUES (?)", (path,))
+            file_id = self._conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()[0]
+            self._file_ids[path] = file_id
+        return file_id
+
+    def _insert(self, file_id: int, entries: Iterable[Tuple[int, dict]]):
+        rows = []
+        for offset, event in entries:
+            code = action_code(event['action'])
+            row = (file_id, offset, event['ts'], event.get('user_id'), event.get('guild_id'))
+            rows.append(row + (code, 0))
+            rows.extend(row + (derived, 1) for derived in derived_actions(code, event))
+        self._conn.executemany(
+            "INSERT INTO postings (file_id, offset, ts, user_id, guild_id, action, derived) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def add(self, path: str, entries: List[Tuple[int, dict]], end_offset: int):
+        """Indexe des enregistrements qui viennent d'être écrits dans un fichier"""
+        with self._lock, self._conn:
+            file_id = self._file_id(path)
+            self._insert(file_id, entries)
+            self._conn.execute("UPDATE files SET indexed_bytes = ? WHERE id = ?", (end_offset, file_id))
+
+    def rename(self, old_path: str, new_path: str):
+        """Suit le déplacement d'un fichier (rotation puis compression d'un segment)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE files SET path = ?, complete = 1 WHERE path = ?", (new_path, old_path)
+            )
+            file_id = self._file_ids.pop(old_path, None)
+            if file_id is not None:
+                self._file_ids[new_path] = file_id
+
+    def catch_up(self, log_path: str):
+        """Indexe les fichiers (ou fins de fichiers) du journal absents de l'index"""
+        for path in segments_for_range(log_path):
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT indexed_bytes, complete FROM files WHERE path = ?", (path,)
+                ).fetchone()
+            indexed_bytes, complete = row if row else (0, 0)
+            if complete:
+                continue
+            if not path.endswith(('.gz', '.zst')) and os.path.exists(path) \
+                    and os.path.getsize(path) < indexed_bytes:
+                # Fichier remplacé hors du bot : ses anciennes positions ne sont plus valides
+                self._forget(path)
+                indexed_bytes = 0
+            try:
+                self._scan(path, indexed_bytes, complete=path != log_path)
+            except FileNotFoundError:
+                continue
+
+    def _forget(self, path: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM postings WHERE file_id IN (SELECT id FROM files WHERE path = ?)", (path,)
+            )
+            self._conn.execute("UPDATE files SET indexed_bytes = 0 WHERE path = ?", (path,))
+
+    def _scan(self, path: str, start: int, complete: bool):
+        with open_segment(path, binary=True) as f:
+            f.seek(start)
+            offset = start
+            entries = []
+
+            for line in f:
+                if line.startswith(b'['):
+                    event = parse_legacy_line(line.decode('utf-8', errors='replace'))
+                    if event is not None:
+                        entries.append((offset, event))
+                offset += len(line)
+
+                if len(entries) >= CATCH_UP_BATCH:
+                    self.add(path, entries, offset)
+                    entries = []
+
+        self.add(path, entries, offset)
+        if complete:
+            with self._lock, self._conn:
+                self._conn.execute("UPDATE files SET complete = 1 WHERE path = ?", (path,))
+
+    def search(self, user_id: Optional[int] = None, guild_id: Optional[int] = None,
+               action: Optional[str] = None, since: Optional[int] = None,
+               until: Optional[int] = None, limit: int = 20) -> List[str]:
+        """
+        Retourne les enregistrements correspondant aux critères, du plus ancien
+        au plus récent (les `limit` plus récents).
+
+        Args:
+            user_id: ID Discord de l'utilisateur
+            guild_id: ID du serveur
+            action: Code d'action (ex: role_removed) ou libellé (ex: Rôle retiré)
+            since: Début de la période (ms epoch)
+            until: Fin de la période (ms epoch)
+            limit: Nombre maximal d'enregistrements
+        """
+        clauses = []
+        params = []
+        for column, value in (('user_id', user_id), ('guild_id', guild_id)):
+            if value is not None:
+                clauses.append(f"p.{column} = ?")
+                params.append(value)
+        if action:
+            clauses.append("p.action = ?")
+            params.append(action_code(action))
+        else:
+            # Une seule ligne par événement sans filtre d'action
+            clauses.append("p.derived = 0")
+        if since is not None:
+            clauses.append("p.ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("p.ts <= ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT f.path, p.offset FROM postings p JOIN files f ON f.id = p.file_id "
+                f"{where} ORDER BY p.ts DESC, p.rowid DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+
+        records = self._read_records(rows)
+        return [records[row] for row in reversed(rows) if row in records]
+
+    def _read_records(self, rows: List[Tuple[str, int]]) -> Dict[Tuple[str, int], str]:
+        """Lit les enregistrements aux positions indiquées, un passage par fichier"""
+        offsets_by_file: Dict[str, List[int]] = {}
+        for path, offset in rows:
+            offsets_by_file.setdefault(path, []).append(offset)
+
+        records = {}
+        for path, offsets in offsets_by_file.items():
+            try:
+                with open_segment(path, binary=True) as f:
+                    for offset, record in _read_records_at(f, sorted(offsets)):
+                        records[(path, offset)] = record
+            except FileNotFoundError:
+                continue
+        return records
+
+
+def _read_records_at(f, offsets: List[int]):
+    """
+    Lit l'enregistrement (avec ses lignes de continuation) à chaque position.
+
+    Les positions sont croissantes : les segments compressés ne sont donc
+    décompressés qu'une fois, en avançant.
+    """
+    lookahead = None
+    for offset in offsets:
+        if lookahead is not None and lookahead[0] == offset:
+            line = lookahead[1]
+        else:
+            f.seek(offset)
+            line = f.readline()
+
+        parts = [line]
+        while True:
+            position = f.tell()
+            following = f.readline()
+            if not following or following.startswith((b'[', b'{')):
+                lookahead = (position, following)
+                break
+            parts.append(following)
+
+        yield offset, b"".join(parts).decode('utf-8', errors='replace').rstrip()
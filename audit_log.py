@@ -0,0 +1,720 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import datetime
+import logging
+import itertools
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, TextIO
+
+try:
+    import zstandard
+except ImportError:  # Compression zstd optionnelle
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Marqueur de fin envoyé dans la file lors de l'arrêt
+_STOP = object()
+
+# Codes stables des actions journalisées par le bot (libellé français -> code)
+ACTION_CODES = {
+    "Bot démarré": "bot_started",
+    "Commande aide exécutée": "command_aide",
+    "Commande admin exécutée": "command_admin",
+    "Commande moncode exécutée": "command_moncode",
+    "Accès admin temporaire demandé": "admin_access_requested",
+    "Tentative d'accès non autorisée": "access_denied",
+    "Tentative d'accès refusée à une commande": "access_denied",
+    "ERREUR: Rôle requis introuvable": "required_role_missing",
+    "Erreur dans la commande admin": "command_admin_error",
+    "Erreur dans la commande moncode": "command_moncode_error",
+    "Erreur de commande": "command_error",
+    "Erreur lors de l'exécution d'une commande": "command_error",
+    "Messages supprimés": "messages_cleared",
+    "Extensions rechargées": "extensions_reloaded",
+    "Compte créé": "account_created",
+    "Comptes créés": "accounts_created",
+    "Salon créé": "channel_created",
+    "Salon supprimé": "channel_deleted",
+    "Membre rejoint": "member_joined",
+    "Membre parti": "member_left",
+    "Rôle ajouté": "role_added",
+    "Rôle retiré": "role_removed",
+    "Rôles modifiés": "roles_changed",
+}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Ligne de l'ancien format : [ts] action - Utilisateur: X (ID: n) - Serveur: Y (ID: n) - clé: valeur ...
+_LEGACY_LINE = re.compile(
+    r"^\[(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (?P<action>.*?) - "
+    r"Utilisateur: (?P<user>.*?) \(ID: (?P<user_id>\d+)\)"
+    r"(?: - Serveur: (?P<guild>.*?) \(ID: (?P<guild_id>\d+)\))?"
+    r"(?P<rest>.*)$"
+)
+_DETAIL_KEY = re.compile(r"^\w+$")
+
+
+def action_code(action: str) -> str:
+    """Retourne le code stable d'une action (dérivé du libellé si inconnu)"""
+    code = ACTION_CODES.get(action)
+    if code:
+        return code
+    ascii_text = unicodedata.normalize('NFKD', action).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', ascii_text.lower()).strip('_') or 'unknown'
+
+
+def make_event(action: str, user_name: str, user_id: int, guild_name: Optional[str] = None,
+               guild_id: Optional[int] = None, details: Optional[dict] = None,
+               ts: Optional[int] = None) -> dict:
+    """Construit un événement d'audit (horodatage en millisecondes epoch)"""
+    return {
+        'ts': ts if ts is not None else int(time.time() * 1000),
+        'action': action,
+        'user': user_name,
+        'user_id': user_id,
+        'guild': guild_name,
+        'guild_id': guild_id,
+        'details': details or {},
+    }
+
+
+def format_text(event: dict) -> str:
+    """Formate un événement dans le format texte historique de bot.log"""
+    timestamp = datetime.datetime.fromtimestamp(event['ts'] / 1000).strftime(TIMESTAMP_FORMAT)
+    line = f"[{timestamp}] {event['action']} - Utilisateur: {event['user']} (ID: {event['user_id']})"
+
+    if event.get('guild_id') is not None:
+        line += f" - Serveur: {event['guild']} (ID: {event['guild_id']})"
+
+    for key, value in event['details'].items():
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(str(item) for item in value)
+        line += f" - {key}: {value}"
+
+    return line
+
+
+def format_json(event: dict) -> str:
+    """Formate un événement en une ligne JSON aux champs typés"""
+    return json.dumps({
+        'ts': event['ts'],
+        'action': action_code(event['action']),
+        'label': event['action'],
+        'user_id': event['user_id'],
+        'user': event['user'],
+        'guild_id': event.get('guild_id'),
+        'guild': event.get('guild'),
+        'details': event['details'],
+    }, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def _coerce(value: str):
+    """Convertit les valeurs numériques de l'ancien format en entiers"""
+    return int(value) if value.isdigit() else value
+
+
+def _parse_details(rest: str) -> dict:
+    details = {}
+    last_key = None
+
+    for part in rest.split(" - ")[1:]:
+        key, sep, value = part.partition(": ")
+        if sep and _DETAIL_KEY.match(key):
+            details[key] = value
+            last_key = key
+        elif last_key is not None:
+            # Le séparateur faisait partie de la valeur précédente
+            details[last_key] += " - " + part
+
+    return {key: _coerce(value) for key, value in details.items()}
+
+
+def parse_legacy_line(line: str) -> Optional[dict]:
+    """Analyse une ligne de l'ancien format de bot.log ; None si elle ne correspond pas"""
+    match = _LEGACY_LINE.match(line.rstrip("\r\n"))
+    if not match:
+        return None
+
+    ts = datetime.datetime.strptime(match['ts'], TIMESTAMP_FORMAT)
+    return make_event(
+        match['action'],
+        match['user'],
+        int(match['user_id']),
+        match['guild'],
+        int(match['guild_id']) if match['guild_id'] else None,
+        _parse_details(match['rest']),
+        ts=int(ts.timestamp() * 1000)
+    )
+
+
+def iter_legacy_events(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Parcourt un journal texte ligne par ligne et produit les événements.
+
+    Les lignes qui ne commencent pas un enregistrement (messages d'erreur sur
+    plusieurs lignes) sont rattachées à la dernière valeur de l'événement précédent.
+    """
+    pending = None
+
+    for line in lines:
+        event = parse_legacy_line(line)
+        if event is not None:
+            if pending is not None:
+                yield pending
+            pending = event
+        elif pending is not None and line.strip():
+            details = pending['details']
+            if details:
+                last_key = next(reversed(details))
+                details[last_key] = f"{details[last_key]}\n{line.rstrip()}"
+            else:
+                details['message'] = line.rstrip()
+
+    if pending is not None:
+        yield pending
+
+
+def convert_legacy_log(source: str, destination: str) -> int:
+    """Convertit bot.log (format texte) en JSONL sans le charger en mémoire"""
+    count = 0
+    with open(source, 'r', encoding='utf-8', errors='replace') as src, \
+            open(destination, 'w', encoding='utf-8') as dst:
+        for event in iter_legacy_events(src):
+            dst.write(format_json(event) + "\n")
+            count += 1
+    return count
+
+
+def parse_json_line(line: str) -> Optional[dict]:
+    """Analyse une ligne JSONL ; None si elle est vide ou invalide"""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def manifest_path(path: str) -> str:
+    """Chemin du manifeste des segments d'un journal"""
+    return f"{path}.manifest.json"
+
+
+class SegmentManifest:
+    """
+    Manifeste JSON des segments fermés d'un journal.
+
+    Chaque segment est décrit par son fichier (relatif au dossier du journal),
+    l'intervalle de temps qu'il couvre (ms epoch) et sa compression.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> List[dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('segments', [])
+        except (OSError, ValueError):
+            return []
+
+    def _save(self, segments: List[dict]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'segments': segments}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def add(self, file: str, start_ts: int, end_ts: int, compression: Optional[str] = None):
+        with self._lock:
+            segments = self.load()
+            segments.append({
+                'file': os.path.basename(file),
+                'start_ts': start_ts,
+                'end_ts': end_ts,
+                'compression': compression,
+            })
+            self._save(segments)
+
+    def replace_file(self, old_file: str, new_file: str, compression: str):
+        """Met à jour un segment après sa compression"""
+        with self._lock:
+            segments = self.load()
+            for segment in segments:
+                if segment['file'] == os.path.basename(old_file):
+                    segment['file'] = os.path.basename(new_file)
+                    segment['compression'] = compression
+            self._save(segments)
+
+
+def _open_compressed(path: str, compression: str, mode: str):
+    if compression == 'zstd':
+        return zstandard.open(path, mode, encoding='utf-8' if 't' in mode else None)
+    return gzip.open(path, mode, encoding='utf-8' if 't' in mode else None)
+
+
+def open_segment(path: str, binary: bool = False):
+    """Ouvre un segment en lecture (texte par défaut), compressé ou non"""
+    mode = 'rb' if binary else 'rt'
+    if path.endswith('.gz'):
+        return _open_compressed(path, 'gzip', mode)
+    if path.endswith('.zst'):
+        return _open_compressed(path, 'zstd', mode)
+    if binary:
+        return open(path, 'rb')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def segments_for_range(path: str, start_ts: Optional[int] = None,
+                       end_ts: Optional[int] = None) -> List[str]:
+    """
+    Liste, dans l'ordre chronologique, les fichiers d'un journal qui couvrent
+    l'intervalle demandé (ms epoch, bornes incluses) : segments fermés d'après
+    le manifeste, puis le fichier actif.
+    """
+    directory = os.path.dirname(path)
+    segments = sorted(SegmentManifest(manifest_path(path)).load(), key=lambda s: s['start_ts'])
+    files = []
+    last_end = None
+
+    for segment in segments:
+        last_end = segment['end_ts'] if last_end is None else max(last_end, segment['end_ts'])
+        if end_ts is not None and segment['start_ts'] > end_ts:
+            continue
+        if start_ts is not None and segment['end_ts'] < start_ts:
+            continue
+        files.append(os.path.join(directory, segment['file']))
+
+    # Le fichier actif contient tout ce qui suit le dernier segment fermé
+    if os.path.exists(path) and (end_ts is None or last_end is None or end_ts >= last_end):
+        files.append(path)
+
+    return files
+
+
+def _iter_file_events(f: TextIO) -> Iterator[dict]:
+    first = f.readline()
+    if not first:
+        return
+    if first.lstrip().startswith('{'):
+        for line in itertools.chain([first], f):
+            event = parse_json_line(line)
+            if event is not None:
+                yield event
+    else:
+        yield from iter_legacy_events(itertools.chain([first], f))
+
+
+def iter_events(path: str, start_ts: Optional[int] = None,
+                end_ts: Optional[int] = None) -> Iterator[dict]:
+    """Parcourt les événements d'un journal (texte ou JSONL) sur un intervalle de temps"""
+    for file in segments_for_range(path, start_ts, end_ts):
+        try:
+            with open_segment(file) as f:
+                for event in _iter_file_events(f):
+                    if start_ts is not None and event['ts'] < start_ts:
+                        continue
+                    if end_ts is not None and event['ts'] > end_ts:
+                        continue
+                    yield event
+        except FileNotFoundError:
+            # Segment compressé entre la lecture du manifeste et l'ouverture
+            continue
+
+
+def _read_lines_backwards(f, block_size: int = 64 * 1024) -> Iterator[str]:
+    """Produit les lignes d'un fichier binaire de la fin vers le début, bloc par bloc"""
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    remainder = b''
+
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        lines = (f.read(read_size) + remainder).split(b'\n')
+        # La première ligne du bloc peut être incomplète : on la garde pour le bloc suivant
+        remainder = lines.pop(0)
+        for line in reversed(lines):
+            if line:
+                yield line.decode('utf-8', errors='replace').rstrip('\r')
+
+    if remainder:
+        yield remainder.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def _iter_records_backwards(path: str) -> Iterator[str]:
+    """Produit les enregistrements d'un fichier du plus récent au plus ancien"""
+    if path.endswith(('.gz', '.zst')):
+        # Un segment compressé ne se lit pas à rebours : sa taille est bornée par la rotation
+        with open_segment(path) as f:
+            lines = reversed(f.read().splitlines())
+            yield from _group_records(lines)
+    else:
+        with open(path, 'rb') as f:
+            yield from _group_records(_read_lines_backwards(f))
+
+
+def _group_records(lines: Iterable[str]) -> Iterator[str]:
+    """Regroupe les lignes de continuation (lues à rebours) avec leur enregistrement"""
+    continuation = []
+    for line in lines:
+        if line.startswith(('[', '{')):
+            yield "\n".join([line] + continuation[::-1])
+            continuation = []
+        elif line.strip():
+            continuation.append(line)
+
+
+def tail_records(path: str, limit: int, contains: Optional[str] = None) -> List[str]:
+    """
+    Retourne les derniers enregistrements d'un journal (du plus ancien au plus récent)
+    sans le parcourir en entier : le fichier actif est lu à rebours depuis la fin,
+    puis les segments fermés les plus récents si nécessaire.
+
+    Args:
+        path: Journal actif (ex: bot.log)
+        limit: Nombre maximal d'enregistrements
+        contains: Filtre optionnel (sous-chaîne, insensible à la casse)
+    """
+    needle = contains.lower() if contains else None
+    records = []
+
+    for file in reversed(segments_for_range(path)):
+        try:
+            for record in _iter_records_backwards(file):
+                if needle is None or needle in record.lower():
+                    records.append(record)
+                    if len(records) >= limit:
+                        return records[::-1]
+        except FileNotFoundError:
+            continue
+
+    return records[::-1]
+
+
+class LogSink:
+    """
+    Fichier de sortie du journal avec son format d'écriture.
+
+    Le fichier actif peut être fermé par taille ou à chaque changement de
+    jour ; le segment fermé est renommé, inscrit au manifeste puis compressé
+    dans un thread de fond. Un index optionnel reçoit la position (en octets)
+    de chaque enregistrement écrit et suit les renommages des segments.
+    """
+
+    def __init__(self, path: str, formatter: Callable[[dict], str],
+                 parser: Callable[[str], Optional[dict]], max_bytes: int = 0,
+                 rotate_daily: bool = False, compression: Optional[str] = 'gzip',
+                 index=None):
+        self.path = path
+        self.index = index
+        self.formatter = formatter
+        self.parser = parser
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compression = _resolve_compression(compression)
+        self.manifest = SegmentManifest(manifest_path(path))
+
+        self._file: Optional[BinaryIO] = None
+        self._size = 0
+        self._first_ts: Optional[int] = None
+        self._last_ts: Optional[int] = None
+        self._day_end: Optional[int] = None
+        self._compressor: Optional[ThreadPoolExecutor] = None
+
+    def write(self, events: List[dict]) -> str:
+        if self._file is None:
+            self._open()
+
+        written = []
+        pending = []
+        for event in events:
+            line = self.formatter(event)
+            data = (line + "\n").encode('utf-8')
+            if self._should_rotate(event['ts'], len(data)):
+                self._write_pending(pending)
+                pending = []
+                self._rotate()
+                self._open()
+            pending.append((self._size, event, data))
+            self._track(event['ts'], len(data))
+            written.append(line)
+
+        self._write_pending(pending)
+        return "\n".join(written) + "\n"
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._compressor is not None:
+            self._compressor.shutdown(wait=True)
+            self._compressor = None
+
+    def _open(self):
+        self._file = open(self.path, 'ab', buffering=1024 * 64)
+        self._size = self._file.tell()
+        self._first_ts = self._last_ts = self._day_end = None
+
+        # Reprendre l'horodatage de début d'un fichier actif existant
+        if self._size > 0:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                event = self.parser(f.readline())
+            if event is not None:
+                self._track(event['ts'], 0)
+
+    def _write_pending(self, pending: List[tuple]):
+        """Écrit les enregistrements (position, événement, octets) en un seul appel"""
+        if not pending:
+            return
+        self._file.write(b"".join(data for _, _, data in pending))
+        self._file.flush()
+        if self.index is not None:
+            self.index.add(self.path, [(offset, event) for offset, event, _ in pending], self._size)
+
+    def _should_rotate(self, ts: int, size: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + size > self.max_bytes:
+            return True
+        return self.rotate_daily and self._day_end is not None and ts >= self._day_end
+
+    def _track(self, ts: int, size: int):
+        self._size += size
+        if self._first_ts is None:
+            self._first_ts = ts
+            day = datetime.datetime.fromtimestamp(ts / 1000).date() + datetime.timedelta(days=1)
+            self._day_end = int(datetime.datetime.combine(day, datetime.time()).timestamp() * 1000)
+        self._last_ts = ts if self._last_ts is None else max(self._last_ts, ts)
+
+    def _rotate(self):
+        """Ferme le fichier actif et le déplace vers un segment horodaté"""
+        self._file.close()
+        self._file = None
+
+        start_ts = self._first_ts
+        if start_ts is None:
+            start_ts = int(os.path.getmtime(self.path) * 1000)
+        end_ts = self._last_ts if self._last_ts is not None else start_ts
+
+        stamp = datetime.datetime.fromtimestamp(start_ts / 1000).strftime('%Y%m%d-%H%M%S')
+        segment = f"{self.path}.{stamp}"
+        suffix = 1
+        while any(os.path.exists(segment + ext) for ext in ('', '.gz', '.zst')):
+            segment = f"{self.path}.{stamp}-{suffix}"
+            suffix += 1
+
+        os.replace(self.path, segment)
+        self.manifest.add(segment, start_ts, end_ts)
+        if self.index is not None:
+            self.index.rename(self.path, segment)
+
+        if self.compression:
+            if self._compressor is None:
+                self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bot-log-compress')
+            self._compressor.submit(self._compress, segment)
+
+    def _compress(self, segment: str):
+        extension = '.zst' if self.compression == 'zstd' else '.gz'
+        target = segment + extension
+        try:
+            with open(segment, 'rb') as src, _open_compressed(target, self.compression, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            self.manifest.replace_file(segment, target, self.compression)
+            if self.index is not None:
+                self.index.rename(segment, target)
+            os.remove(segment)
+        except Exception as e:
+            logger.error("Erreur lors de la compression de %s: %s", segment, e)
+            if os.path.exists(target):
+                os.remove(target)
+
+
+def _resolve_compression(compression: Optional[str]) -> Optional[str]:
+    """Valide le mode de compression ; zstd nécessite le paquet zstandard"""
+    if not compression or compression == 'none':
+        return None
+    if compression == 'zstd' and zstandard is None:
+        logger.warning("zstandard non installé, compression gzip utilisée pour les journaux")
+        return 'gzip'
+    if compression not in ('gzip', 'zstd'):
+        raise ValueError(f"Compression de journal inconnue: {compression}")
+    return compression
+
+
+class AuditLogWriter:
+    """
+    Écrit le journal d'audit du bot (bot.log) en arrière-plan.
+
+    Les événements sont placés dans une file en mémoire puis écrits par
+    lots : une seule écriture et un seul flush par lot et par fichier, dans un
+    thread séparé pour ne jamais bloquer la boucle d'événements de discord.py.
+    """
+
+    def __init__(self, path: str = 'bot.log', flush_interval: float = 1.0,
+                 max_batch: int = 256, max_queue: int = 10000, echo: bool = True,
+                 jsonl_path: Optional[str] = None, max_bytes: int = 0,
+                 rotate_daily: bool = False, compression: Optional[str] = 'gzip',
+                 index=None):
+        """
+        Args:
+            path: Fichier de journal au format texte
+            flush_interval: Délai maximal (secondes) avant l'écriture d'un lot incomplet
+            max_batch: Nombre maximal d'événements par lot
+            max_queue: Taille de la file ; au-delà, log_action attend (contre-pression)
+            echo: Recopier aussi les lignes texte sur la sortie standard
+            jsonl_path: Fichier JSONL structuré optionnel (un objet JSON par événement)
+            max_bytes: Taille à partir de laquelle le fichier actif est fermé (0 = jamais)
+            rotate_daily: Fermer le fichier actif à chaque changement de jour
+            compression: Compression des segments fermés : 'gzip', 'zstd' ou None
+            index: Index optionnel (audit_index.AuditIndex) alimenté à chaque écriture
+        """
+        self.path = path
+        self.index = index
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self.max_queue = max_queue
+        self.echo = echo
+
+        rotation = {'max_bytes': max_bytes, 'rotate_daily': rotate_daily, 'compression': compression}
+        self.text_sink = LogSink(path, format_text, parse_legacy_line, index=index, **rotation)
+        self.json_sink = LogSink(jsonl_path, format_json, parse_json_line, **rotation) if jsonl_path else None
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Compteurs exposés pour le diagnostic
+        self.records_written = 0
+        self.batches_written = 0
+
+    def start(self):
+        """Démarre la tâche d'écriture sur la boucle courante (idempotent)"""
+        if self._task is not None and not self._task.done():
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def put(self, event: dict):
+        """Ajoute un événement à la file ; attend si la file est pleine"""
+        self.start()
+        await self._queue.put(event)
+
+    def pending(self) -> int:
+        """Nombre d'événements en attente d'écriture"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self):
+        """Écrit tout ce qui reste dans la file puis ferme les fichiers"""
+        if self._task is not None and not self._task.done():
+            await self._queue.put(_STOP)
+            await self._task
+        self._task = None
+        await asyncio.to_thread(self._close_sinks)
+
+    def _sinks(self) -> List[LogSink]:
+        return [sink for sink in (self.text_sink, self.json_sink) if sink is not None]
+
+    def _close_sinks(self):
+        for sink in self._sinks():
+            sink.close()
+        if self.index is not None:
+            self.index.close()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        # Indexer ce qui a été écrit depuis la dernière exécution avant les nouveaux lots
+        if self.index is not None:
+            try:
+                await asyncio.to_thread(self.index.catch_up, self.path)
+            except Exception as e:
+                logger.error("Erreur lors de la mise à jour de l'index du journal: %s", e)
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+
+            # Compléter le lot jusqu'à la taille maximale ou l'expiration du délai
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.error("Erreur lors de l'écriture du journal: %s", e)
+
+    def _write_batch(self, batch: List[dict]):
+        """Écrit un lot complet dans chaque fichier (exécuté hors boucle)"""
+        text = self.text_sink.write(batch)
+        if self.json_sink is not None:
+            self.json_sink.write(batch)
+
+        if self.echo:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        self.records_written += len(batch)
+        self.batches_written += 1
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Outils du journal d'audit du bot")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert = subparsers.add_parser('convert', help="Convertit bot.log (texte) en JSONL")
+    convert.add_argument('source', help="Journal texte à convertir (ex: bot.log)")
+    convert.add_argument('destination', help="Fichier JSONL à créer (ex: bot.jsonl)")
+
+    events = subparsers.add_parser('events', help="Affiche les événements d'une période")
+    events.add_argument('path', help="Journal actif (ex: bot.log)")
+    events.add_argument('--since', help="Début de la période (AAAA-MM-JJ[ HH:MM:SS])")
+    events.add_argument('--until', help="Fin de la période (AAAA-MM-JJ[ HH:MM:SS])")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        count = convert_legacy_log(args.source, args.destination)
+        print(f"{count} événements convertis vers {args.destination}")
+    elif args.command == 'events':
+        start_ts = _parse_cli_time(args.since)
+        end_ts = _parse_cli_time(args.until)
+        for event in iter_events(args.path, start_ts, end_ts):
+            print(format_json(event))
+
+
+def _parse_cli_time(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    return int(datetime.datetime.fromisoformat(value).timestamp() * 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,25 @@
+import io
 import os
 import discord
 import datetime
-import aiohttp
 import asyncio
 import json
+import logging
 from discord.ext import commands
 from dotenv import load_dotenv
 from typing import Optional, Union
+from audit_log import AuditLogWriter, make_event, tail_records
+from audit_index import AuditIndex
+from log_config import setup_logging
+from permissions import BOT_OWNER, PermissionRegistry, RoleCache
+from website_client import CircuitOpenError, LogPage, WebsiteClient, WebsiteError, parse_log_page
 
 # Charger les variables d'environnement
 load_dotenv()
 
+# Journalisation de diagnostic (niveaux réglables par module via LOG_LEVEL / LOG_LEVELS)
+logger = logging.getLogger('bot')
+
 # Configuration des intents
 intents = discord.Intents.default()
 intents.messages = True
@@ -22,6 +31,34 @@ intents.message_content = True
 WEBSITE_API_URL = os.getenv('WEBSITE_API_URL')
 WEBSITE_API_KEY = os.getenv('WEBSITE_API_KEY')
 
+# Client de l'API du site : session partagée, délais, nouvelles tentatives et disjoncteur
+website = WebsiteClient(
+    base_url=WEBSITE_API_URL,
+    api_key=WEBSITE_API_KEY,
+    register_url=os.getenv('WEBSITE_REGISTER_URL', 'http://localhost:3000/api/discord/register'),
+    register_api_key=os.getenv('API_KEY'),
+    register_batch_url=os.getenv('WEBSITE_REGISTER_BATCH_URL'),  # Par défaut WEBSITE_REGISTER_URL + /batch
+    pool_size=int(os.getenv('WEBSITE_HTTP_POOL_SIZE', '20')),
+    pool_size_per_host=int(os.getenv('WEBSITE_HTTP_POOL_PER_HOST', '10')),
+    dns_cache_ttl=int(os.getenv('WEBSITE_HTTP_DNS_TTL', '300')),
+    keepalive_timeout=float(os.getenv('WEBSITE_HTTP_KEEPALIVE', '30')),
+    timeout=float(os.getenv('WEBSITE_HTTP_TIMEOUT', '10')),
+    connect_timeout=float(os.getenv('WEBSITE_HTTP_CONNECT_TIMEOUT', '5')),
+    max_retries=int(os.getenv('WEBSITE_HTTP_RETRIES', '2')),
+    max_concurrency=int(os.getenv('WEBSITE_HTTP_MAX_CONCURRENCY', '10')),
+    failure_threshold=int(os.getenv('WEBSITE_CIRCUIT_THRESHOLD', '5')),
+    reset_timeout=float(os.getenv('WEBSITE_CIRCUIT_RESET', '30')),
+    cache_ttls={
+        'stats': float(os.getenv('WEBSITE_CACHE_STATS_TTL', '30')),
+        'users': float(os.getenv('WEBSITE_CACHE_USERS_TTL', '60'))
+    },
+    cache_stale_ttl=float(os.getenv('WEBSITE_CACHE_STALE_TTL', '300')),
+    cache_size=int(os.getenv('WEBSITE_CACHE_SIZE', '256'))
+)
+
+# Option des commandes du site pour ignorer le cache
+NO_CACHE_FLAG = '--no-cache'
+
 # ID du rôle admin
 ADMIN_ROLE_ID = 1452850689288962079
 
@@ -32,54 +69,120 @@ ROLES = {
     'moderator': 1452844554536489144  # ID du rôle Modérateur
 }
 
+# Index du journal d'audit par utilisateur, serveur et action (vide = désactivé)
+AUDIT_INDEX_PATH = os.getenv('BOT_LOG_INDEX', 'bot.log.index.db')
+
+# Cache des privilèges résolus par (serveur, membre)
+role_cache = RoleCache(ROLES, ADMIN_ROLE_ID)
+
+# Journal d'audit écrit par lots en arrière-plan
+audit_log = AuditLogWriter(
+    'bot.log',
+    flush_interval=float(os.getenv('BOT_LOG_FLUSH_INTERVAL', '1.0')),
+    max_batch=int(os.getenv('BOT_LOG_MAX_BATCH', '256')),
+    max_queue=int(os.getenv('BOT_LOG_QUEUE_SIZE', '10000')),
+    jsonl_path=os.getenv('BOT_LOG_JSONL') or None,  # Journal structuré optionnel (ex: bot.jsonl)
+    max_bytes=int(os.getenv('BOT_LOG_MAX_BYTES', str(10 * 1024 * 1024))),  # Rotation par taille (0 = désactivée)
+    rotate_daily=os.getenv('BOT_LOG_ROTATE_DAILY', '0') == '1',  # Rotation à chaque changement de jour
+    compression=os.getenv('BOT_LOG_COMPRESSION', 'gzip'),  # gzip, zstd ou none
+    index=AuditIndex(AUDIT_INDEX_PATH) if AUDIT_INDEX_PATH else None
+)
+
+class TradingBot(commands.Bot):
+    """Bot avec démarrage et arrêt propres des tâches de fond"""
+
+    async def setup_hook(self):
+        audit_log.start()
+        await website.start()
+
+    async def close(self):
+        await super().close()
+        await website.close()
+        # Écrire les derniers enregistrements avant l'arrêt
+        await audit_log.close()
+
 # Initialisation du bot avec le préfixe de commande
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = TradingBot(command_prefix='!', intents=intents)
+
+# Permissions des commandes : niveau minimal, section d'aide, utilisation, description
+# Les niveaux de rôle exigent aussi le rôle d'accès au bot (ADMIN_ROLE_ID)
+COMMAND_PERMISSIONS = {
+    'logs': ('admin', "🌐 Gestion du Site Web (Admin)", "!logs [par page]", "Affiche les logs du site, page par page"),
+    'stats': ('admin', "🌐 Gestion du Site Web (Admin)", "!stats [--no-cache]", "Affiche les statistiques du site"),
+    'siteuser': ('admin', "🌐 Gestion du Site Web (Admin)", "!siteuser <id> [--no-cache]", "Affiche les infos d'un utilisateur"),
+    'admin': ('admin', "⚙️ Administration", "!admin", "Génère des identifiants temporaires"),
+    'clear': ('moderator', "⚙️ Administration", "!clear [nombre]", "Supprime des messages"),
+    'compte': ('admin', "⚙️ Administration", "!compte @utilisateur [role]", "Crée un compte utilisateur"),
+    'comptes': ('admin', "⚙️ Administration", "!comptes @role|@membres... [role]", "Crée les comptes d'un groupe"),
+    'reload': (BOT_OWNER, "🔒 Commandes Propriétaire", "!reload [extension]", "Recharge une extension du bot"),
+    'botlogs': (BOT_OWNER, "🔒 Commandes Propriétaire", "!botlogs [nombre] [filtre]", "Affiche le journal local du bot"),
+    'audit': (BOT_OWNER, "🔒 Commandes Propriétaire", "!audit [user:ID] [serveur:ID|ici] [action:code] [jours:N]", "Recherche dans le journal du bot"),
+    'botstats': (BOT_OWNER, "🔒 Commandes Propriétaire", "!botstats", "Affiche les métriques internes du bot"),
+    'serverinfo': ('member', "🔧 Utilitaires", "!serverinfo", "Affiche les infos du serveur"),
+    'userinfo': ('member', "🔧 Utilitaires", "!userinfo [@utilisateur]", "Affiche les infos d'un membre"),
+    'aide': ('member', "🔧 Utilitaires", "!aide", "Affiche ce message d'aide"),
+    'help': ('member', None, None, None),
+}
+
+command_permissions = PermissionRegistry(COMMAND_PERMISSIONS)
 
-# Fonction de journalisation
-async def has_permission(ctx):
-    """Vérifie si l'utilisateur a le rôle requis pour utiliser le bot"""
+@bot.check
+async def check_command_permission(ctx):
+    """
+    Vérification unique des permissions de chaque commande, d'après COMMAND_PERMISSIONS.
+    Le rôle résolu est conservé dans ctx.user_role pour le corps de la commande.
+    """
+    permission = command_permissions.get(ctx.command.qualified_name)
+    if permission is None:
+        # Une commande non déclarée est refusée par sécurité
+        logger.error("Commande sans permission déclarée: %s", ctx.command.qualified_name)
+        return False
+    
+    if permission.level == BOT_OWNER:
+        if not await ctx.bot.is_owner(ctx.author):
+            raise commands.NotOwner()
+        return True
+    
     try:
-        # Vérifier si c'est en MP (refuser tout accès en MP)
+        # Refuser tout accès en MP
         if not ctx.guild:
             return False
-            
-        # Vérifier si l'utilisateur a le rôle requis
-        required_role = ctx.guild.get_role(ADMIN_ROLE_ID)
-        if not required_role:
+        
+        privileges = role_cache.resolve(ctx.author, ctx.guild)
+        if privileges.bot_access and command_permissions.allows(permission, privileges.level):
+            ctx.user_role = privileges.level
+            return True
+        
+        if not privileges.bot_access and not ctx.guild.get_role(ADMIN_ROLE_ID):
             await log_action("ERREUR: Rôle requis introuvable", ctx.author, ctx.guild)
             return False
-            
-        has_required_role = required_role in ctx.author.roles
         
         # Journaliser les tentatives d'accès non autorisées
-        if not has_required_role:
-            await log_action("Tentative d'accès non autorisée", 
-                          ctx.author, 
-                          ctx.guild,
-                          commande=ctx.command.name if ctx.command else "inconnue",
-                          message="Rôle requis manquant")
-            
-        return has_required_role
+        await log_action("Tentative d'accès non autorisée", 
+                      ctx.author, 
+                      ctx.guild,
+                      commande=ctx.command.name,
+                      message="Rôle requis manquant" if not privileges.bot_access else f"Niveau requis: {permission.level}")
+        return False
         
     except Exception as e:
-        print(f"Erreur dans has_permission: {str(e)}")
+        logger.error("Erreur dans check_command_permission: %s", e)
         # En cas d'erreur, on refuse l'accès par sécurité
         return False
 
 async def log_action(action: str, user: Union[discord.Member, discord.User], guild: discord.Guild = None, **details):
     """Journalise une action effectuée par un utilisateur"""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_message = f"[{timestamp}] {action} - Utilisateur: {user} (ID: {user.id})"
-    
-    if guild:
-        log_message += f" - Serveur: {guild.name} (ID: {guild.id})"
-    
-    for key, value in details.items():
-        log_message += f" - {key}: {value}"
+    event = make_event(
+        action,
+        str(user),
+        user.id,
+        guild.name if guild else None,
+        guild.id if guild else None,
+        details
+    )
     
-    print(log_message)
-    with open('bot.log', 'a', encoding='utf-8') as f:
-        f.write(f"{log_message}\n")
+    # L'écriture (fichier + console) est faite par lots hors de la boucle d'événements
+    await audit_log.put(event)
 
 def get_role_color(role_name: str) -> int:
     """Retourne la couleur correspondant au rôle"""
@@ -96,44 +199,46 @@ def get_user_role(ctx) -> str:
     Détermine le rôle principal de l'utilisateur avec priorité : Owner > Admin > Moderator > Member
     Retourne une chaîne représentant le rôle : 'owner', 'admin', 'moderator' ou 'member'
     """
+    # Rôle déjà résolu par la vérification des permissions de la commande
+    role = getattr(ctx, 'user_role', None)
+    if role is not None:
+        return role
+        
     try:
         if not ctx.guild:  # Si c'est en MP
-            print("Avertissement: Commande utilisée en MP, rôle par défaut: member")
+            logger.debug("Commande utilisée en MP, rôle par défaut: member")
             return 'member'
             
-        member = ctx.author
-        
-        # Vérifier si l'utilisateur est le propriétaire du serveur
-        if member == ctx.guild.owner:
-            print(f"Détection de rôle: {member} est le propriétaire du serveur")
-            return 'owner'
-            
-        # Vérifier les rôles dans l'ordre de priorité
-        for role in member.roles:
-            if role.id == ROLES['owner']:
-                print(f"Détection de rôle: {member} a le rôle Owner")
-                return 'owner'
-            elif role.id == ROLES['admin']:
-                print(f"Détection de rôle: {member} a le rôle Admin")
-                return 'admin'
-            elif role.id == ROLES['moderator']:
-                print(f"Détection de rôle: {member} a le rôle Moderator")
-                return 'moderator'
-        
-        print(f"Détection de rôle: {member} n'a aucun rôle spécial, rôle par défaut: member")
-        return 'member'
+        role = role_cache.resolve(ctx.author, ctx.guild).level
+        logger.debug("Détection de rôle: %s a le rôle %s", ctx.author, role)
+        return role
         
     except Exception as e:
-        print(f"Erreur dans get_user_role: {str(e)}")
+        logger.error("Erreur dans get_user_role: %s", e)
         return 'member'  # En cas d'erreur, retourner le rôle le moins élevé
 
 @bot.event
 async def on_ready():
+    # Appelé après chaque nouvelle identification : les changements de rôles
+    # faits pendant la déconnexion n'ont pas produit d'événements
+    role_cache.clear()
     await log_action("Bot démarré", bot.user, None, version="1.0")
-    print(f'Connecté en tant que {bot.user.name} (ID: {bot.user.id})')
-    print('------')
+    logger.info("Connecté en tant que %s (ID: %s)", bot.user.name, bot.user.id)
     await bot.change_presence(activity=discord.Game(name='!aide pour les commandes'))
 
+def registration_payload(credentials: dict, discord_user: discord.Member, role: str) -> dict:
+    """Données d'enregistrement d'un compte attendues par l'API du site"""
+    # Calculer la date d'expiration (10 minutes à partir de maintenant)
+    expires_at = (datetime.datetime.utcnow() + datetime.timedelta(minutes=10)).isoformat()
+    
+    return {
+        'username': credentials['username'],
+        'password': credentials['password'],
+        'discordId': str(discord_user.id),
+        'role': role.lower(),  # L'API s'attend à un rôle en minuscules
+        'expiresAt': expires_at  # Date d'expiration du compte
+    }
+
 async def register_user_on_website(credentials: dict, discord_user: discord.Member, role: str) -> bool:
     """
     Enregistre l'utilisateur sur le site web via l'API
@@ -146,63 +251,37 @@ async def register_user_on_website(credentials: dict, discord_user: discord.Memb
     Returns:
         bool: True si l'enregistrement a réussi, False sinon
     """
-    # URL de l'API d'enregistrement Discord
-    api_url = "http://localhost:3000/api/discord/register"
-    
-    # Récupérer la clé API depuis les variables d'environnement
-    api_key = os.getenv('API_KEY')
-    if not api_key:
-        print("❌ Clé API non configurée dans les variables d'environnement")
+    # Vérifier la clé API d'enregistrement (variable d'environnement API_KEY)
+    if not website.register_api_key:
+        logger.error("Clé API non configurée dans les variables d'environnement")
         return False
     
-    # Calculer la date d'expiration (10 minutes à partir de maintenant)
-    from datetime import datetime, timedelta
-    expires_at = (datetime.utcnow() + timedelta(minutes=10)).isoformat()
-    
     # Préparer les données pour l'API
-    payload = {
-        'username': credentials['username'],
-        'password': credentials['password'],
-        'discordId': str(discord_user.id),
-        'role': role.lower(),  # L'API s'attend à un rôle en minuscules
-        'expiresAt': expires_at  # Date d'expiration du compte
-    }
+    payload = registration_payload(credentials, discord_user, role)
     
-    print(f"Tentative d'enregistrement de l'utilisateur {credentials.get('username')} avec le rôle {role}...")
+    logger.debug("Tentative d'enregistrement de l'utilisateur %s avec le rôle %s", credentials.get('username'), role)
     
     try:
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {api_key}'
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            # Envoyer la requête à l'API
-            async with session.post(api_url, json=payload, headers=headers) as response:
-                if response.status == 201:
-                    data = await response.json()
-                    print(f"✅ Utilisateur {credentials['username']} créé avec succès (Rôle: {role})")
-                    print(f"Réponse API: {data}")
-                    return True
-                else:
-                    try:
-                        data = await response.json()
-                        error_msg = data.get('error', 'Erreur inconnue')
-                        print(f"❌ Erreur API ({response.status}): {error_msg}")
-                        print(f"Détails: {data}")
-                    except:
-                        error_text = await response.text()
-                        print(f"❌ Erreur API ({response.status}): Réponse non JSON")
-                        print(f"Réponse brute: {error_text}")
-                    return False
-                    
-    except aiohttp.ClientError as e:
-        print(f"❌ Erreur de connexion à l'API: {str(e)}")
+        # Envoyer la requête à l'API (POST : jamais réessayé automatiquement)
+        response = await website.register_user(payload)
+        if response.status == 201:
+            logger.info("Utilisateur %s créé avec succès (Rôle: %s)", credentials['username'], role)
+            logger.debug("Réponse API: %s", response.data)
+            return True
+        
+        if isinstance(response.data, dict):
+            logger.warning("Erreur API (%s): %s", response.status, response.data.get('error', 'Erreur inconnue'))
+            logger.debug("Détails: %s", response.data)
+        else:
+            logger.warning("Erreur API (%s): Réponse non JSON", response.status)
+            logger.debug("Réponse brute: %s", response.data)
+        return False
+                
+    except WebsiteError as e:
+        logger.error("Erreur de connexion à l'API: %s", e)
         return False
     except Exception as e:
-        print(f"❌ Erreur inattendue: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erreur inattendue lors de l'enregistrement: %s", e)
         return False
 
 def generate_credentials(user_id: int, discord_username: str, role: str) -> dict:
@@ -220,7 +299,7 @@ def generate_credentials(user_id: int, discord_username: str, role: str) -> dict
     import secrets
     import string
     
-    print(f"Génération des identifiants pour {discord_username} (ID: {user_id}, Rôle: {role})")
+    logger.debug("Génération des identifiants pour %s (ID: %s, Rôle: %s)", discord_username, user_id, role)
     
     # Générer un mot de passe sécurisé
     alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
@@ -261,11 +340,11 @@ def generate_credentials(user_id: int, discord_username: str, role: str) -> dict
         'generated_at': datetime.datetime.now().isoformat()
     }
     
-    print(f"Identifiants générés: {credentials}")
+    # Le mot de passe n'est jamais écrit dans les journaux
+    logger.debug("Identifiants générés: utilisateur %s, email %s", username, email)
     return credentials
 
 @bot.command(name='aide')
-@commands.check(has_permission)
 async def aide(ctx):
     """Affiche les commandes disponibles selon votre rôle"""
     
@@ -279,59 +358,14 @@ async def aide(ctx):
         color=get_role_color(role)
     )
     
-    # Section Administration du Site (uniquement pour les admins)
-    if role in ['owner', 'admin']:
-        embed.add_field(
-            name="🌐 Gestion du Site Web (Admin)",
-            value="""
-            `!logs [nombre]` - Affiche les logs récents du site
-            `!stats` - Affiche les statistiques du site
-            `!siteuser <id>` - Affiche les infos d'un utilisateur
-            """,
-            inline=False
-        )
-    
-    # Section Administration (pour les modérateurs et plus)
-    if role in ['owner', 'admin', 'moderator']:
-        admin_commands = """
-        `!admin` - Génère des identifiants temporaires
-        `!clear [nombre]` - Supprime des messages
-        """
-        
-        # Commande réservée aux propriétaires et admins
-        if role in ['owner', 'admin']:
-            admin_commands += """
-            `!compte @utilisateur [role]` - Crée un compte utilisateur
-            """
-            
-        embed.add_field(
-            name="⚙️ Administration",
-            value=admin_commands,
-            inline=False
-        )
-    
-    # Section Commandes Spéciales (uniquement pour le propriétaire)
-    if role == 'owner':
+    # Sections générées depuis la table des permissions des commandes
+    for section, entries in command_permissions.listing(role):
         embed.add_field(
-            name="🔒 Commandes Propriétaire",
-            value="""
-            `!reload [extension]` - Recharge une extension du bot
-            `!shutdown` - Éteint le bot
-            """,
+            name=section,
+            value="\n".join(f"`{entry.usage}` - {entry.description}" for entry in entries),
             inline=False
         )
     
-    # Section Utilitaires (pour tous)
-    embed.add_field(
-        name="🔧 Utilitaires",
-        value="""
-        `!serverinfo` - Affiche les infos du serveur
-        `!userinfo [@utilisateur]` - Affiche les infos d'un membre
-        `!aide` - Affiche ce message d'aide
-        """,
-        inline=False
-    )
-    
     # Pied de page
     embed.set_footer(text=f"Rôle: {role.capitalize()} • Demandé par {ctx.author.name}", 
                     icon_url=ctx.author.avatar.url if ctx.author.avatar else None)
@@ -345,7 +379,6 @@ async def aide(ctx):
     await ctx.send(embed=embed)
 
 @bot.command(name='admin')
-@commands.check(has_permission)
 async def admin_cmd(ctx):
     """Génère des identifiants temporaires pour le panel d'administration"""
     try:
@@ -357,14 +390,8 @@ async def admin_cmd(ctx):
             
         await log_action("Commande admin exécutée", ctx.author, ctx.guild)
         
-        # Vérifier si l'utilisateur est dans un serveur
-        if not ctx.guild:
-            return await ctx.send("❌ Cette commande ne peut pas être utilisée en message privé.", delete_after=10)
-
-        # Vérifier les permissions
+        # Rôle (admin ou owner) vérifié par check_command_permission
         role = get_user_role(ctx)
-        if role not in ['owner', 'admin']:
-            return await ctx.send("❌ Vous devez être administrateur pour utiliser cette commande.", delete_after=10)
 
         # Créer un message de chargement
         msg = await ctx.send("⏳ Génération de vos identifiants d'administration...")
@@ -373,7 +400,7 @@ async def admin_cmd(ctx):
         try:
             credentials = generate_credentials(ctx.author.id, ctx.author.name, role)
         except Exception as e:
-            print(f"❌ Erreur lors de la génération des identifiants: {str(e)}")
+            logger.error("Erreur lors de la génération des identifiants: %s", e)
             return await msg.edit(content="❌ Erreur lors de la génération des identifiants.", delete_after=10)
         
         # Créer un embed pour afficher les identifiants
@@ -430,7 +457,7 @@ async def admin_cmd(ctx):
             
     except Exception as e:
         error_msg = f"❌ Une erreur est survenue: {str(e)}"
-        print(f"❌ Erreur dans la commande admin: {str(e)}")
+        logger.error("Erreur dans la commande admin: %s", e)
         await log_action("Erreur dans la commande admin", ctx.author, ctx.guild, error=str(e))
         
         # Essayer d'envoyer un message d'erreur
@@ -440,7 +467,6 @@ async def admin_cmd(ctx):
             pass
 
 @bot.command(name='clear')
-@commands.has_permissions(manage_messages=True)
 async def clear_messages(ctx, amount: int = 5):
     """Supprime un nombre spécifié de messages (par défaut: 5)"""
     try:
@@ -461,11 +487,10 @@ async def clear_messages(ctx, amount: int = 5):
         await log_action("Messages supprimés", ctx.author, ctx.guild, nombre=amount)
         
     except Exception as e:
-        print(f"Erreur dans la commande clear: {str(e)}")
+        logger.error("Erreur dans la commande clear: %s", e)
         await ctx.send("❌ Une erreur est survenue lors de la suppression des messages.")
 
 @bot.command(name='reload')
-@commands.is_owner()
 async def reload_extension(ctx, extension=None):
     """Recharge une extension (propriétaire uniquement)"""
     try:
@@ -487,10 +512,187 @@ async def reload_extension(ctx, extension=None):
         
     except Exception as e:
         await ctx.send(f'❌ Erreur lors du rechargement: {str(e)}')
-        print(f'Erreur de rechargement: {str(e)}')
+        logger.error("Erreur de rechargement: %s", e)
+
+def format_records_message(records: list, header: str) -> str:
+    """
+    Formate des enregistrements du journal dans un bloc de code, en gardant les plus
+    récents dans la limite de 2000 caractères d'un message Discord
+    """
+    lines = []
+    total = len(header)
+    for record in reversed(records):
+        if total + len(record) + 1 > 1900:
+            break
+        lines.append(record)
+        total += len(record) + 1
+    
+    return f"{header}\n```\n" + "\n".join(reversed(lines)) + "\n```"
+
+@bot.command(name='botlogs')
+async def bot_logs(ctx, limit: Optional[int] = 10, *, filtre: str = None):
+    """Affiche les derniers événements du journal local du bot (propriétaire uniquement)"""
+    try:
+        limit = max(1, min(limit or 10, 50))
+        
+        # Lecture à rebours depuis la fin du fichier, hors de la boucle d'événements
+        records = await asyncio.to_thread(tail_records, audit_log.path, limit, filtre)
+        
+        if not records:
+            return await ctx.send("ℹ️ Aucun événement trouvé dans le journal du bot.", delete_after=10)
+        
+        header = "📝 Derniers événements" + (f" contenant `{filtre}`" if filtre else "")
+        await ctx.send(format_records_message(records, header))
+        
+    except Exception as e:
+        logger.error("Erreur dans la commande botlogs: %s", e)
+        await ctx.send("❌ Une erreur est survenue lors de la lecture du journal du bot.")
+
+@bot.command(name='audit')
+async def audit_search(ctx, *criteres: str):
+    """
+    Recherche dans le journal du bot via l'index (propriétaire uniquement)
+    
+    Utilisation: !audit [user:ID|@utilisateur] [serveur:ID|ici] [action:code] [jours:N] [limite:N]
+    Exemple: !audit user:1429585635500363876 jours:7
+    """
+    if audit_log.index is None:
+        return await ctx.send("❌ L'index du journal est désactivé (BOT_LOG_INDEX).", delete_after=10)
+    
+    filters = {}
+    limit = 20
+    days = None
+    
+    try:
+        for critere in criteres:
+            # Une mention seule désigne l'utilisateur recherché
+            if critere.startswith('<@') and critere.endswith('>'):
+                filters['user_id'] = int(critere.strip('<@!>'))
+                continue
+                
+            key, _, value = critere.partition(':')
+            key = key.lower()
+            if key in ('user', 'utilisateur'):
+                filters['user_id'] = int(value.strip('<@!>'))
+            elif key in ('serveur', 'guild'):
+                filters['guild_id'] = ctx.guild.id if value == 'ici' and ctx.guild else int(value)
+            elif key == 'action':
+                filters['action'] = value
+            elif key == 'jours':
+                days = float(value)
+            elif key == 'limite':
+                limit = max(1, min(int(value), 50))
+            else:
+                raise ValueError(critere)
+    except ValueError:
+        return await ctx.send(f"❌ Critère invalide. Utilisation : `!audit {audit_search.signature}`\n"
+                              "Exemple : `!audit user:1429585635500363876 action:role_removed jours:7`", delete_after=15)
+    
+    if days is not None:
+        filters['since'] = int((datetime.datetime.now() - datetime.timedelta(days=days)).timestamp() * 1000)
+    
+    try:
+        records = await asyncio.to_thread(audit_log.index.search, limit=limit, **filters)
+        
+        if not records:
+            return await ctx.send("ℹ️ Aucun événement ne correspond à ces critères.", delete_after=10)
+            
+        await ctx.send(format_records_message(records, f"🔎 {len(records)} événement(s) trouvé(s)"))
+        
+    except Exception as e:
+        logger.error("Erreur dans la commande audit: %s", e)
+        await ctx.send("❌ Une erreur est survenue lors de la recherche dans le journal du bot.")
+
+@bot.command(name='botstats')
+async def bot_stats(ctx):
+    """Affiche les métriques internes du bot (propriétaire uniquement)"""
+    embed = discord.Embed(title="📈 Métriques du bot", color=0x5865F2)
+    
+    http = website.stats.as_dict()
+    embed.add_field(
+        name="🌐 Connexions au site",
+        value=(
+            f"Requêtes: {http['requests']}\n"
+            f"Connexions créées: {http['connections_created']}\n"
+            f"Connexions réutilisées: {http['connections_reused']} ({http['reuse_ratio']:.0%})\n"
+            f"Cache DNS: {http['dns_cache_hits']} succès / {http['dns_cache_misses']} échecs\n"
+            f"Requêtes fusionnées (évitées): {website.coalesced}\n"
+            f"Disjoncteurs: {', '.join(f'{host}: {state}' for host, state in website.breaker_states().items()) or 'aucun appel'}"
+        ),
+        inline=False
+    )
+    
+    cache = website.cache.stats()
+    embed.add_field(
+        name="🗄️ Cache des réponses du site",
+        value=(
+            f"Entrées: {cache['entries']}\n"
+            f"Succès: {cache['hits']} / Périmées servies: {cache['stale_hits']} / Échecs: {cache['misses']} "
+            f"({cache['hit_ratio']:.0%})"
+        ),
+        inline=False
+    )
+    
+    roles = role_cache.stats()
+    embed.add_field(
+        name="🎭 Cache des rôles",
+        value=(
+            f"Entrées: {roles['entries']}\n"
+            f"Succès: {roles['hits']} / Échecs: {roles['misses']} ({roles['hit_ratio']:.0%})\n"
+            f"Invalidations: {roles['invalidations']}"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="📝 Journal d'audit",
+        value=(
+            f"Événements écrits: {audit_log.records_written}\n"
+            f"Lots écrits: {audit_log.batches_written}\n"
+            f"En attente: {audit_log.pending()}"
+        ),
+        inline=False
+    )
+    
+    await ctx.send(embed=embed)
+
+# URL du panel selon le rôle
+PANEL_URLS = {
+    'owner': 'http://localhost:3000/admin/owner',
+    'admin': 'http://localhost:3000/admin/dashboard',
+    'moderator': 'http://localhost:3000/moderator/dashboard',
+    'member': 'http://localhost:3000/dashboard'
+}
+
+# Rôles de compte disponibles sur le site
+ACCOUNT_ROLES = ['owner', 'admin', 'moderator', 'member']
+
+def panel_url(role_type: str) -> str:
+    return PANEL_URLS.get(role_type, 'http://localhost:3000/login')
+
+def welcome_embed(member: discord.Member, role_type: str) -> discord.Embed:
+    """Message de bienvenue envoyé en privé au titulaire d'un nouveau compte"""
+    user_embed = discord.Embed(
+        title="🎉 Votre compte a été créé !",
+        description=f"Bienvenue sur notre plateforme, {member.mention} !\n"
+                  f"Vous avez reçu le rôle **{role_type.capitalize()}**.",
+        color=0x3498db
+    )
+    
+    user_embed.add_field(
+        name="Comment vous connecter",
+        value=(
+            f"1. Rendez-vous sur [notre site]({panel_url(role_type)})\n"
+            f"2. Connectez-vous avec les identifiants qui vous ont été envoyés en message privé\n"
+            f"3. Changez votre mot de passe après la première connexion"
+        ),
+        inline=False
+    )
+    
+    user_embed.set_footer(text="Si vous n'avez pas reçu vos identifiants, contactez un administrateur.")
+    return user_embed
 
 @bot.command(name='compte')
-@commands.check(has_permission)
 async def create_account(ctx, member: discord.Member = None, *, role_type: str = 'member'):
     """
     Crée un compte pour un utilisateur avec un rôle spécifique
@@ -505,12 +707,8 @@ async def create_account(ctx, member: discord.Member = None, *, role_type: str =
         pass
         
     try:
-        # Vérifier que la commande est utilisée par un admin ou modérateur
+        # Rôle du demandeur (admin ou owner) vérifié par check_command_permission
         requester_role = get_user_role(ctx)
-        
-        # Vérifier si l'utilisateur a la permission d'utiliser cette commande
-        if requester_role not in ['admin', 'owner']:
-            return await ctx.send("❌ Vous n'avez pas la permission d'utiliser cette commande.", delete_after=10)
             
         # Vérifier si un membre est mentionné
         if not member:
@@ -518,21 +716,17 @@ async def create_account(ctx, member: discord.Member = None, *, role_type: str =
         
         # Nettoyer et valider le rôle
         role_type = role_type.lower().strip()
-        valid_roles = ['owner', 'admin', 'moderator', 'member']
         
         # Vérifier que le rôle demandé est valide
-        if role_type not in valid_roles:
+        if role_type not in ACCOUNT_ROLES:
             return await ctx.send(
-                f"❌ Rôle invalide. Rôles disponibles: {', '.join(valid_roles)}",
+                f"❌ Rôle invalide. Rôles disponibles: {', '.join(ACCOUNT_ROLES)}",
                 delete_after=15
             )
             
         # Vérifier les permissions
         if role_type == 'owner' and requester_role != 'owner':
             return await ctx.send("❌ Seul le propriétaire peut créer un compte propriétaire.", delete_after=10)
-            
-        if role_type == 'admin' and requester_role not in ['owner', 'admin']:
-            return await ctx.send("❌ Vous n'avez pas la permission de créer un compte administrateur.", delete_after=10)
         
         # Vérifier si l'utilisateur a déjà un compte
         # (à implémenter selon votre logique métier)
@@ -550,14 +744,6 @@ async def create_account(ctx, member: discord.Member = None, *, role_type: str =
             if not success:
                 return await msg.edit(content="❌ Échec de la création du compte. Veuillez réessayer.", delete_after=15)
             
-            # URL du panel selon le rôle
-            panel_urls = {
-                'owner': 'http://localhost:3000/admin/owner',
-                'admin': 'http://localhost:3000/admin/dashboard',
-                'moderator': 'http://localhost:3000/moderator/dashboard',
-                'member': 'http://localhost:3000/dashboard'
-            }
-            
             # Créer l'embed pour l'administrateur
             admin_embed = discord.Embed(
                 title=f"✅ Compte {role_type.capitalize()} créé",
@@ -576,7 +762,7 @@ async def create_account(ctx, member: discord.Member = None, *, role_type: str =
             
             admin_embed.add_field(
                 name="🌐 Accès au panel",
-                value=f"[Accéder au panel]({panel_urls.get(role_type, 'http://localhost:3000/login')})\n`{panel_urls.get(role_type, 'http://localhost:3000/login')}`",
+                value=f"[Accéder au panel]({panel_url(role_type)})\n`{panel_url(role_type)}`",
                 inline=False
             )
             
@@ -589,32 +775,9 @@ async def create_account(ctx, member: discord.Member = None, *, role_type: str =
             except discord.Forbidden:
                 await msg.edit(content="❌ Je ne peux pas vous envoyer de message privé. Activez les messages privés pour recevoir les identifiants.", delete_after=15)
             
-            # Créer l'embed pour l'utilisateur
-            user_embed = discord.Embed(
-                title="🎉 Votre compte a été créé !",
-                description=f"Bienvenue sur notre plateforme, {member.mention} !\n"
-                          f"Vous avez reçu le rôle **{role_type.capitalize()}**.",
-                color=0x3498db
-            )
-            
-            # Créer l'URL du panel
-            panel_url = panel_urls.get(role_type, 'http://localhost:3000/login')
-            
-            user_embed.add_field(
-                name="Comment vous connecter",
-                value=(
-                    f"1. Rendez-vous sur [notre site]({panel_url})\n"
-                    f"2. Connectez-vous avec les identifiants qui vous ont été envoyés en message privé\n"
-                    f"3. Changez votre mot de passe après la première connexion"
-                ),
-                inline=False
-            )
-            
-            user_embed.set_footer(text="Si vous n'avez pas reçu vos identifiants, contactez un administrateur.")
-            
             # Envoyer un message à l'utilisateur
             try:
-                await member.send(embed=user_embed)
+                await member.send(embed=welcome_embed(member, role_type))
             except discord.Forbidden:
                 await ctx.send(f"ℹ️ {member.mention}, activez vos messages privés pour recevoir vos identifiants.", delete_after=15)
             
@@ -628,19 +791,158 @@ async def create_account(ctx, member: discord.Member = None, *, role_type: str =
             )
             
         except Exception as e:
-            print(f"❌ Erreur lors de la création du compte: {str(e)}")
+            logger.error("Erreur lors de la création du compte: %s", e)
             await msg.edit(content="❌ Une erreur est survenue lors de la création du compte.", delete_after=15)
             
     except Exception as e:
-        print(f"❌ Erreur dans la commande compte: {str(e)}")
+        logger.error("Erreur dans la commande compte: %s", e)
         if 'msg' in locals():
             await msg.edit(content="❌ Une erreur est survenue. Veuillez réessayer.", delete_after=15)
         else:
             await ctx.send("❌ Une erreur est survenue. Veuillez réessayer.", delete_after=15)
 
+# Nombre maximal de comptes envoyés par appel à l'enregistrement groupé
+REGISTER_BATCH_SIZE = int(os.getenv('WEBSITE_REGISTER_BATCH_SIZE', '100'))
+
+# Messages privés de bienvenue envoyés simultanément
+WELCOME_DM_CONCURRENCY = 5
+
+async def register_users_on_website(entries: list, role: str) -> dict:
+    """
+    Enregistre plusieurs utilisateurs sur le site par lots de REGISTER_BATCH_SIZE
+    
+    Args:
+        entries: Liste de (membre Discord, identifiants)
+        role: Rôle des comptes (owner, admin, moderator, member)
+        
+    Returns:
+        dict: ID Discord -> None si le compte a été créé, sinon le message d'erreur
+    """
+    results = {}
+    for start in range(0, len(entries), REGISTER_BATCH_SIZE):
+        chunk = entries[start:start + REGISTER_BATCH_SIZE]
+        payloads = [registration_payload(credentials, member, role) for member, credentials in chunk]
+        
+        try:
+            response = await website.register_users(payloads)
+        except WebsiteError as e:
+            logger.error("Erreur de connexion à l'API (enregistrement groupé): %s", e)
+            results.update({member.id: "Site injoignable" for member, _ in chunk})
+            continue
+        
+        if response.status != 200 or not isinstance(response.data, dict):
+            error = response.data.get('error') if isinstance(response.data, dict) else None
+            logger.warning("Erreur API (%s) lors de l'enregistrement groupé: %s", response.status, error)
+            results.update({member.id: error or f"Erreur {response.status}" for member, _ in chunk})
+            continue
+        
+        by_discord_id = {str(item.get('discordId')): item for item in response.data.get('results', [])}
+        for member, _ in chunk:
+            item = by_discord_id.get(str(member.id), {})
+            results[member.id] = None if item.get('status') == 'created' else item.get('error', "Résultat manquant")
+    
+    return results
+
+@bot.command(name='comptes')
+async def create_accounts(ctx, *, arguments: str = ''):
+    """
+    Crée les comptes d'un groupe de membres en un enregistrement groupé
+    
+    Utilisation: !comptes @role [role] ou !comptes @membre1 @membre2 ... [role]
+    Rôles disponibles: owner, admin, moderator, member
+    
+    Les cibles sont lues dans les mentions du message (jamais par nom) : le
+    rôle du site ne peut pas être pris pour un membre ou un rôle Discord.
+    """
+    # Supprimer le message de commande
+    try:
+        await ctx.message.delete()
+    except:
+        pass
+    
+    # Seul mot hors mentions : le rôle du site
+    words = [word for word in arguments.split() if not (word.startswith('<@') and word.endswith('>'))]
+    role_type = words[0].lower() if len(words) == 1 else 'member' if not words else None
+    if role_type not in ACCOUNT_ROLES:
+        return await ctx.send(f"❌ Rôle invalide. Rôles disponibles: {', '.join(ACCOUNT_ROLES)}", delete_after=15)
+    if role_type == 'owner' and get_user_role(ctx) != 'owner':
+        return await ctx.send("❌ Seul le propriétaire peut créer un compte propriétaire.", delete_after=10)
+    
+    # Membres ciblés (un rôle mentionné compte pour tous ses membres), sans doublons ni bots
+    targets = [ctx.guild.get_role(role_id) for role_id in ctx.message.raw_role_mentions]
+    targets += [ctx.guild.get_member(user_id) for user_id in ctx.message.raw_mentions]
+    members = {}
+    for target in filter(None, targets):
+        for member in (target.members if isinstance(target, discord.Role) else [target]):
+            if not member.bot:
+                members[member.id] = member
+    
+    if not members:
+        return await ctx.send("❌ Veuillez mentionner un rôle ou des utilisateurs. Exemple: `!comptes @Promo member`", delete_after=10)
+    
+    msg = await ctx.send(f"⏳ Création de {len(members)} comptes {role_type}...")
+    
+    try:
+        entries = [
+            (member, generate_credentials(member.id, member.display_name, role_type))
+            for member in members.values()
+        ]
+        results = await register_users_on_website(entries, role_type)
+        
+        created = [(member, credentials) for member, credentials in entries if results.get(member.id) is None]
+        failed = [(member, results[member.id]) for member, _ in entries if results.get(member.id) is not None]
+        
+        # Un seul message privé pour le demandeur, avec les identifiants en pièce jointe
+        lines = [f"{member} ({member.id}) | {credentials['username']} | {credentials['password']}" for member, credentials in created]
+        if failed:
+            lines += ["", "Échecs:"] + [f"{member} ({member.id}) | {error}" for member, error in failed]
+        
+        summary = discord.Embed(
+            title=f"✅ Comptes {role_type.capitalize()} créés",
+            description=f"{len(created)} compte(s) créé(s), {len(failed)} échec(s).",
+            color=0x2ecc71 if not failed else 0xf39c12
+        )
+        summary.add_field(name="🌐 Accès au panel", value=f"`{panel_url(role_type)}`", inline=False)
+        summary.set_footer(text="Ces informations sont confidentielles")
+        
+        try:
+            await ctx.author.send(
+                embed=summary,
+                file=discord.File(io.BytesIO("\n".join(lines).encode('utf-8')), filename="comptes.txt")
+            )
+            await msg.edit(content=f"✅ {len(created)} compte(s) créé(s), {len(failed)} échec(s). Détails envoyés en message privé.", delete_after=15)
+        except discord.Forbidden:
+            await msg.edit(content="❌ Je ne peux pas vous envoyer de message privé. Activez les messages privés pour recevoir les identifiants.", delete_after=15)
+        
+        # Messages de bienvenue, en parallèle mais en nombre limité
+        semaphore = asyncio.Semaphore(WELCOME_DM_CONCURRENCY)
+        
+        async def welcome(member):
+            async with semaphore:
+                try:
+                    await member.send(embed=welcome_embed(member, role_type))
+                    return True
+                except discord.HTTPException:
+                    return False
+        
+        delivered = await asyncio.gather(*(welcome(member) for member, _ in created))
+        
+        await log_action(
+            "Comptes créés",
+            ctx.author,
+            ctx.guild,
+            role=role_type,
+            crees=len(created),
+            echecs=len(failed),
+            bienvenue_non_remise=delivered.count(False)
+        )
+        
+    except Exception as e:
+        logger.exception("Erreur dans la commande comptes: %s", e)
+        await msg.edit(content="❌ Une erreur est survenue lors de la création des comptes.", delete_after=15)
+
 # Commandes d'administration
 @bot.command(name='serverinfo')
-@commands.check(has_permission)
 async def server_info(ctx):
     """Affiche des informations sur le serveur"""
     try:
@@ -692,11 +994,10 @@ async def server_info(ctx):
         await ctx.send(embed=embed)
         
     except Exception as e:
-        print(f"Erreur dans la commande serverinfo: {str(e)}")
+        logger.error("Erreur dans la commande serverinfo: %s", e)
         await ctx.send("❌ Une erreur est survenue lors de la récupération des informations du serveur.")
 
 @bot.command(name='userinfo')
-@commands.check(has_permission)
 async def user_info(ctx, member: discord.Member = None):
     """Affiche des informations sur un utilisateur"""
     try:
@@ -739,7 +1040,7 @@ async def user_info(ctx, member: discord.Member = None):
         await ctx.send(embed=embed)
         
     except Exception as e:
-        print(f"Erreur dans la commande userinfo: {str(e)}")
+        logger.error("Erreur dans la commande userinfo: %s", e)
         await ctx.send("❌ Une erreur est survenue lors de la récupération des informations de l'utilisateur.")
 
 # Gestion des erreurs de commande
@@ -777,7 +1078,7 @@ async def on_command_error(ctx, error):
     else:
         # Pour les erreurs non gérées spécifiquement
         error_msg = f"Erreur dans la commande {command_name}: {error_msg}"
-        print(error_msg)
+        logger.error(error_msg)
         await ctx.send("❌ Une erreur inattendue est survenue lors de l'exécution de la commande.")
     
     # Logger l'erreur
@@ -806,168 +1107,308 @@ async def on_member_join(member):
 
 @bot.event
 async def on_member_remove(member):
+    role_cache.invalidate_member(member.guild.id, member.id)
     await log_action("Membre parti", member, member.guild)
 
+@bot.event
+async def on_guild_role_update(before, after):
+    # Un rôle suivi (niveaux ou accès au bot) a changé
+    if role_cache.is_tracked([after.id]):
+        role_cache.invalidate_guild(after.guild.id)
+
+@bot.event
+async def on_guild_role_delete(role):
+    if role_cache.is_tracked([role.id]):
+        role_cache.invalidate_guild(role.guild.id)
+
+@bot.event
+async def on_guild_update(before, after):
+    # Changement de propriétaire du serveur
+    if before.owner_id != after.owner_id:
+        role_cache.invalidate_member(after.id, before.owner_id)
+        role_cache.invalidate_member(after.id, after.owner_id)
+
+@bot.event
+async def on_guild_remove(guild):
+    role_cache.invalidate_guild(guild.id)
+
 @bot.event
 async def on_member_update(before, after):
-    if before.roles != after.roles:
-        added = [role for role in after.roles if role not in before.roles]
-        removed = [role for role in before.roles if role not in after.roles]
+    # Chemin rapide : les changements de pseudo, d'avatar, etc. ne touchent pas aux rôles
+    before_ids = {role.id for role in before.roles}
+    after_ids = {role.id for role in after.roles}
+    if before_ids == after_ids:
+        return
+    
+    role_cache.invalidate_member(after.guild.id, after.id)
+    
+    added = [role for role in after.roles if role.id not in before_ids]
+    removed = [role for role in before.roles if role.id not in after_ids]
+    
+    # Un seul enregistrement avec tous les rôles ajoutés et retirés
+    details = {}
+    if added:
+        details['roles_ajoutes'] = [role.name for role in added]
+        details['roles_ajoutes_ids'] = [role.id for role in added]
+    if removed:
+        details['roles_retires'] = [role.name for role in removed]
+        details['roles_retires_ids'] = [role.id for role in removed]
         
-        if added:
-            await log_action("Rôle ajouté", after, after.guild, 
-                           role=added[0].name, role_id=added[0].id)
-        if removed:
-            await log_action("Rôle retiré", after, after.guild,
-                           role=removed[0].name, role_id=removed[0].id)
+    await log_action("Rôles modifiés", after, after.guild, **details)
 
 # Démarrer le bot
 # Commandes pour le site web
+# Nombre maximal d'entrées par page de !logs (taille d'un embed)
+LOGS_PAGE_MAX = 10
+
+# Durée d'activité des boutons de navigation de !logs (secondes)
+LOGS_VIEW_TIMEOUT = 180
+
+def logs_embed(page: LogPage, number: int) -> discord.Embed:
+    """Embed d'une page de logs du site"""
+    embed = discord.Embed(
+        title=f"📝 Logs du site — page {number}",
+        color=0x3498db
+    )
+    
+    for log in page.entries:
+        timestamp = log.get('timestamp', 'Inconnu')
+        if timestamp != 'Inconnu':
+            try:
+                dt = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                timestamp = dt.strftime('%d/%m/%Y %H:%M')
+            except:
+                pass
+            
+        message = str(log.get('message', 'Aucun message'))
+        if len(message) > 500:
+            message = message[:497] + "..."
+        embed.add_field(
+            name=f"`{log.get('level', 'INFO')}` - {timestamp}",
+            value=f"**{message}**",
+            inline=False
+        )
+    
+    if not page.entries:
+        embed.description = "Aucun log."
+    return embed
+
+async def fetch_logs_page(page_size: int, cursor: Optional[str] = None) -> LogPage:
+    response = await website.get_logs(page_size, cursor)
+    if response.status != 200:
+        raise WebsiteError(f"Erreur {response.status}")
+    return parse_log_page(response.data, page_size)
+
+class LogsView(discord.ui.View):
+    """
+    Navigation dans les logs du site, page par page.
+    
+    Les pages déjà vues sont gardées pour revenir en arrière ; la page
+    suivante est préchargée en arrière-plan pendant la lecture de la page
+    courante et n'est jamais demandée au-delà.
+    """
+    
+    def __init__(self, author_id: int, page_size: int, first_page: LogPage):
+        super().__init__(timeout=LOGS_VIEW_TIMEOUT)
+        self.author_id = author_id
+        self.page_size = page_size
+        self.pages = [first_page]
+        self.index = 0
+        self.message = None
+        self._prefetch: Optional[asyncio.Task] = None
+        # Clics traités l'un après l'autre : une même page n'est jamais chargée deux fois
+        self._navigation = asyncio.Lock()
+        self._prefetch_next()
+        self._update_buttons()
+    
+    def _prefetch_next(self):
+        cursor = self.pages[-1].next_cursor
+        if self.index + 1 == len(self.pages) and cursor and self._prefetch is None:
+            self._prefetch = asyncio.create_task(fetch_logs_page(self.page_size, cursor))
+    
+    def _update_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index + 1 == len(self.pages) and not self.pages[-1].next_cursor
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Seul l'auteur de la commande peut changer de page.", ephemeral=True)
+            return False
+        return True
+    
+    @discord.ui.button(label="◀ Précédent", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self._navigation.locked():
+            await interaction.response.defer()
+        async with self._navigation:
+            if self.index == 0:
+                return
+            self.index -= 1
+            await self._show(interaction)
+    
+    @discord.ui.button(label="Suivant ▶", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self._navigation.locked():
+            # Un clic précédent charge encore sa page : répondre à Discord avant son délai de 3 secondes
+            await interaction.response.defer()
+        async with self._navigation:
+            if self.index + 1 == len(self.pages):
+                if not self.pages[-1].next_cursor:
+                    return
+                task, self._prefetch = self._prefetch, None
+                if task is None:
+                    task = asyncio.create_task(fetch_logs_page(self.page_size, self.pages[-1].next_cursor))
+                if not task.done() and not interaction.response.is_done():
+                    await interaction.response.defer()
+                try:
+                    self.pages.append(await task)
+                except Exception as e:
+                    logger.warning("Chargement de la page de logs impossible: %s", e)
+                    message = "❌ Impossible de charger la page suivante."
+                    # Préchargement déjà en échec : l'interaction n'a pas encore reçu de réponse
+                    if interaction.response.is_done():
+                        return await interaction.followup.send(message, ephemeral=True)
+                    return await interaction.response.send_message(message, ephemeral=True)
+            
+            self.index += 1
+            self._prefetch_next()
+            await self._show(interaction)
+    
+    async def _show(self, interaction: discord.Interaction):
+        self._update_buttons()
+        embed = logs_embed(self.pages[self.index], self.index + 1)
+        if interaction.response.is_done():
+            await interaction.edit_original_response(embed=embed, view=self)
+        else:
+            await interaction.response.edit_message(embed=embed, view=self)
+    
+    async def on_timeout(self):
+        if self._prefetch is not None:
+            if self._prefetch.done() and not self._prefetch.cancelled():
+                self._prefetch.exception()  # Erreur de préchargement jamais affichée
+            self._prefetch.cancel()
+        for item in self.children:
+            item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
 @bot.command(name='logs')
-@commands.has_permissions(administrator=True)
-async def show_logs(ctx, limit: int = 5):
-    """Affiche les logs récents du site web (admin uniquement)"""
-    if not WEBSITE_API_KEY:
+async def show_logs(ctx, page_size: int = 5):
+    """Affiche les logs récents du site web, page par page (admin uniquement)"""
+    if not website.configured:
         return await ctx.send("❌ La clé API du site web n'est pas configurée.")
 
-    headers = {'Authorization': f'Bearer {WEBSITE_API_KEY}'}
-
+    page_size = max(1, min(page_size, LOGS_PAGE_MAX))
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{WEBSITE_API_URL}/logs?limit={limit}",
-                headers=headers
-            ) as response:
-                if response.status == 200:
-                    logs = await response.json()
-                    embed = discord.Embed(
-                        title=f"📝 {len(logs)} Derniers Logs",
-                        color=0x3498db
-                    )
-                    
-                    for log in logs:
-                        timestamp = log.get('timestamp', 'Inconnu')
-                        if timestamp != 'Inconnu':
-                            try:
-                                dt = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                                timestamp = dt.strftime('%d/%m/%Y %H:%M')
-                            except:
-                                pass
-                            
-                        embed.add_field(
-                            name=f"`{log.get('level', 'INFO')}` - {timestamp}",
-                            value=f"**{log.get('message', 'Aucun message')}**",
-                            inline=False
-                        )
-                        
-                    await ctx.send(embed=embed)
-                else:
-                    await ctx.send(f"❌ Erreur {response.status}: Impossible de récupérer les logs")
-                    
+        page = await fetch_logs_page(page_size)
+        if not page.next_cursor:
+            return await ctx.send(embed=logs_embed(page, 1))
+        
+        view = LogsView(ctx.author.id, page_size, page)
+        view.message = await ctx.send(embed=logs_embed(page, 1), view=view)
+            
+    except CircuitOpenError:
+        await ctx.send("❌ Le site est momentanément indisponible. Réessayez dans quelques instants.")
+    except WebsiteError as e:
+        await ctx.send(f"❌ {e}: Impossible de récupérer les logs")
     except Exception as e:
         await ctx.send(f"❌ Erreur: {str(e)}")
 
 @bot.command(name='stats')
-@commands.has_permissions(administrator=True)
-async def show_stats(ctx):
+async def show_stats(ctx, option: str = None):
     """Affiche les statistiques du site web (admin uniquement)"""
-    if not WEBSITE_API_KEY:
+    if not website.configured:
         return await ctx.send("❌ La clé API du site web n'est pas configurée.")
 
-    headers = {'Authorization': f'Bearer {WEBSITE_API_KEY}'}
-
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{WEBSITE_API_URL}/stats",
-                headers=headers
-            ) as response:
-                if response.status == 200:
-                    stats = await response.json()
-                    embed = discord.Embed(
-                        title="📊 Statistiques du site",
-                        color=0x2ecc71,
-                        timestamp=datetime.datetime.utcnow()
-                    )
-                    
-                    stats_fields = {
-                        '👥 Utilisateurs': stats.get('users', 0),
-                        '📝 Articles': stats.get('posts', 0),
-                        '💬 Commentaires': stats.get('comments', 0),
-                        '🔗 Liens': stats.get('links', 0)
-                    }
-                    
-                    for name, value in stats_fields.items():
-                        embed.add_field(name=name, value=value, inline=True)
-                    
-                    if 'last_updated' in stats:
-                        try:
-                            dt = datetime.datetime.fromisoformat(stats['last_updated'].replace('Z', '+00:00'))
-                            last_updated = dt.strftime('%d/%m/%Y %H:%M')
-                            embed.add_field(name="🕒 Dernière mise à jour", value=last_updated, inline=False)
-                        except:
-                            pass
-                            
-                    await ctx.send(embed=embed)
-                else:
-                    await ctx.send(f"❌ Erreur {response.status}: Impossible de récupérer les statistiques")
+        response = await website.get_stats(use_cache=option != NO_CACHE_FLAG)
+        if response.status == 200:
+            stats = response.data
+            embed = discord.Embed(
+                title="📊 Statistiques du site",
+                color=0x2ecc71,
+                timestamp=datetime.datetime.utcnow()
+            )
+            
+            stats_fields = {
+                '👥 Utilisateurs': stats.get('users', 0),
+                '📝 Articles': stats.get('posts', 0),
+                '💬 Commentaires': stats.get('comments', 0),
+                '🔗 Liens': stats.get('links', 0)
+            }
+            
+            for name, value in stats_fields.items():
+                embed.add_field(name=name, value=value, inline=True)
+            
+            if 'last_updated' in stats:
+                try:
+                    dt = datetime.datetime.fromisoformat(stats['last_updated'].replace('Z', '+00:00'))
+                    last_updated = dt.strftime('%d/%m/%Y %H:%M')
+                    embed.add_field(name="🕒 Dernière mise à jour", value=last_updated, inline=False)
+                except:
+                    pass
                     
+            await ctx.send(embed=embed)
+        else:
+            await ctx.send(f"❌ Erreur {response.status}: Impossible de récupérer les statistiques")
+            
+    except CircuitOpenError:
+        await ctx.send("❌ Le site est momentanément indisponible. Réessayez dans quelques instants.")
     except Exception as e:
         await ctx.send(f"❌ Erreur: {str(e)}")
 
 @bot.command(name='siteuser')
-@commands.has_permissions(administrator=True)
-async def site_user_info(ctx, user_id: int):
+async def site_user_info(ctx, user_id: int, option: str = None):
     """Affiche les informations d'un utilisateur du site (admin uniquement)"""
-    if not WEBSITE_API_KEY:
+    if not website.configured:
         return await ctx.send("❌ La clé API du site web n'est pas configurée.")
 
-    headers = {'Authorization': f'Bearer {WEBSITE_API_KEY}'}
-
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{WEBSITE_API_URL}/users/{user_id}",
-                headers=headers
-            ) as response:
-                if response.status == 200:
-                    user = await response.json()
-                    embed = discord.Embed(
-                        title=f"👤 {user.get('username', 'Utilisateur inconnu')}",
-                        color=0x9b59b6
-                    )
+        response = await website.get_user(user_id, use_cache=option != NO_CACHE_FLAG)
+        if response.status == 200:
+            user = response.data
+            embed = discord.Embed(
+                title=f"👤 {user.get('username', 'Utilisateur inconnu')}",
+                color=0x9b59b6
+            )
+            
+            if 'email' in user:
+                embed.add_field(name="📧 Email", value=user['email'], inline=False)
+            if 'role' in user:
+                embed.add_field(name="👑 Rôle", value=user['role'], inline=True)
+            if 'created_at' in user:
+                try:
+                    dt = datetime.datetime.fromisoformat(user['created_at'].replace('Z', '+00:00'))
+                    created_at = dt.strftime('%d/%m/%Y')
+                    embed.add_field(name="📅 Inscrit le", value=created_at, inline=True)
+                except:
+                    pass
                     
-                    if 'email' in user:
-                        embed.add_field(name="📧 Email", value=user['email'], inline=False)
-                    if 'role' in user:
-                        embed.add_field(name="👑 Rôle", value=user['role'], inline=True)
-                    if 'created_at' in user:
-                        try:
-                            dt = datetime.datetime.fromisoformat(user['created_at'].replace('Z', '+00:00'))
-                            created_at = dt.strftime('%d/%m/%Y')
-                            embed.add_field(name="📅 Inscrit le", value=created_at, inline=True)
-                        except:
-                            pass
-                            
-                    if 'last_login' in user and user['last_login']:
-                        try:
-                            dt = datetime.datetime.fromisoformat(user['last_login'].replace('Z', '+00:00'))
-                            last_login = dt.strftime('%d/%m/%Y %H:%M')
-                            embed.add_field(name="🕒 Dernière connexion", value=last_login, inline=False)
-                        except:
-                            pass
-                            
-                    if 'is_active' in user:
-                        status = "✅ Actif" if user['is_active'] else "❌ Inactif"
-                        embed.add_field(name="🔒 Statut", value=status, inline=True)
-                        
-                    await ctx.send(embed=embed)
-                else:
-                    await ctx.send(f"❌ Erreur {response.status}: Utilisateur non trouvé")
+            if 'last_login' in user and user['last_login']:
+                try:
+                    dt = datetime.datetime.fromisoformat(user['last_login'].replace('Z', '+00:00'))
+                    last_login = dt.strftime('%d/%m/%Y %H:%M')
+                    embed.add_field(name="🕒 Dernière connexion", value=last_login, inline=False)
+                except:
+                    pass
                     
+            if 'is_active' in user:
+                status = "✅ Actif" if user['is_active'] else "❌ Inactif"
+                embed.add_field(name="🔒 Statut", value=status, inline=True)
+                
+            await ctx.send(embed=embed)
+        else:
+            await ctx.send(f"❌ Erreur {response.status}: Utilisateur non trouvé")
+            
+    except CircuitOpenError:
+        await ctx.send("❌ Le site est momentanément indisponible. Réessayez dans quelques instants.")
     except Exception as e:
         await ctx.send(f"❌ Erreur: {str(e)}")
 
 # Démarrer le bot
 if __name__ == "__main__":
-    bot.run(os.getenv('DISCORD_TOKEN'))
+    setup_logging()
+    bot.run(os.getenv('DISCORD_TOKEN'), log_handler=None)
@@ -0,0 +1,77 @@
+import os
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Dict, Optional, TextIO
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_settings: Optional[tuple] = None
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """Analyse une liste de niveaux par module, ex: "bot=DEBUG,audit_log=WARNING" """
+    levels = {}
+    for item in spec.split(','):
+        name, sep, level = item.partition('=')
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: Optional[str] = None, levels: Optional[Dict[str, str]] = None,
+                  stream: Optional[TextIO] = None):
+    """
+    Configure la journalisation de diagnostic du bot et du site (idempotent).
+
+    Les messages passent par une file : le thread appelant ne fait que créer
+    l'enregistrement, l'écriture sur la console est faite par un thread dédié.
+    Les niveaux se règlent globalement (LOG_LEVEL) et par module (LOG_LEVELS) ;
+    un message sous le niveau de son module n'est jamais formaté.
+    """
+    global _listener, _settings
+    if _listener is not None:
+        return
+    _settings = (level, levels, stream)
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    if levels is None:
+        levels = parse_levels(os.getenv('LOG_LEVELS', ''))
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Vide la file des messages en attente puis arrête le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    """Le thread d'écriture n'est pas copié par fork : le processus enfant en démarre un"""
+    global _listener
+    if _listener is not None:
+        _listener = None
+        setup_logging(*_settings)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
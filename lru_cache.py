@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Dictionnaire borné (LRU), utilisable par plusieurs threads, avec compteurs
+    de succès, d'échecs et d'invalidations.
+
+    Base commune des caches du projet, qui n'ajoutent que leur politique :
+    validité d'une entrée (argument `fresh` de get), borne supplémentaire
+    (_over_limit) ou suivi du coût des entrées (_added / _removed).
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        Args:
+            max_entries: Nombre maximal d'entrées gardées (les moins récemment utilisées sont oubliées)
+        """
+        self.max_entries = max_entries
+        # Réentrant : une sous-classe peut enchaîner get() et set() sous le même verrou
+        self.lock = threading.RLock()
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, fresh: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """Retourne l'entrée (None si absente, ou si `fresh` la juge périmée : elle est alors retirée)"""
+        with self.lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                if fresh is None or fresh(value):
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any):
+        with self.lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = value
+            self._added(key, value)
+            while self._entries and self._over_limit():
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Retire une entrée ; retourne True si elle était en cache"""
+        with self.lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self.invalidations += 1
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.invalidations += len(self._entries)
+            for key in list(self._entries):
+                self._remove(key)
+
+    def keys(self) -> List[Hashable]:
+        """Copie des clés (du moins au plus récemment utilisé)"""
+        with self.lock:
+            return list(self._entries)
+
+    def _remove(self, key: Hashable) -> Any:
+        value = self._entries.pop(key)
+        self._removed(key, value)
+        return value
+
+    def _over_limit(self) -> bool:
+        return len(self._entries) > self.max_entries
+
+    def _added(self, key: Hashable, value: Any):
+        """Appelé à l'ajout d'une entrée (sous le verrou)"""
+
+    def _removed(self, key: Hashable, value: Any):
+        """Appelé au retrait d'une entrée : éviction, péremption ou invalidation (sous le verrou)"""
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
@@ -1,33 +1,44 @@
 import os
+import sys
+import signal
 import asyncio
+import argparse
 import threading
-from app import app as web_app
-from bot import bot
+import subprocess
+from log_config import setup_logging
 import logging
 
-# Configuration du logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Charger les variables d'environnement
+# Charger les variables d'environnement (avant la journalisation : LOG_LEVEL peut venir du .env)
 from dotenv import load_dotenv
 load_dotenv()
 
-def run_web():
-    """Lance le serveur web Flask"""
-    web_app.run(host='0.0.0.0', port=5000, debug=False)
+# Configuration du logging (niveaux par module via LOG_LEVEL / LOG_LEVELS)
+setup_logging()
+logger = logging.getLogger(__name__)
+
+def run_web(host: str, port: int):
+    """Lance le serveur web Flask (serveur de développement)"""
+    from app import app as web_app
+    web_app.run(host=host, port=port, debug=False)
 
 async def run_bot():
     """Lance le bot Discord"""
+    from bot import bot
     try:
         token = os.getenv('DISCORD_BOT_TOKEN')
         if not token:
             logger.error("Token Discord non trouvé dans les variables d'environnement")
             return
-            
+
+        if sys.platform != 'win32':
+            # Arrêt propre (journal d'audit vidé) quand le processus principal s'arrête
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, lambda: asyncio.ensure_future(bot.close())
+            )
+
         await bot.start(token)
     except Exception as e:
-        logger.error(f"Erreur lors du démarrage du bot: {e}")
+        logger.error("Erreur lors du démarrage du bot: %s", e)
     finally:
         if not bot.is_closed():
             await bot.close()
@@ -39,20 +50,145 @@ def run_async(coro):
     loop.run_until_complete(coro)
     loop.close()
 
+def run_bot_process():
+    """Point d'entrée du processus du bot (--serve bot, lancé par le mode production)"""
+    # Ctrl+C est géré par le processus principal, qui arrête le bot avec SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    setup_logging()
+    run_async(run_bot())
+
+def serve_wsgi(web_app, options):
+    """
+    Sert l'application avec un serveur WSGI de production : gunicorn (plusieurs
+    processus, chacun multi-thread) ou, à défaut et sous Windows, waitress
+    (un processus multi-thread).
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        BaseApplication = None
+
+    if BaseApplication is None or os.name == 'nt':
+        from waitress import serve
+        logger.info("Serveur web (waitress) sur http://%s:%s, %s threads", options.host, options.port, options.workers * options.threads)
+        serve(
+            web_app,
+            host=options.host,
+            port=options.port,
+            threads=options.workers * options.threads,
+            channel_timeout=options.keepalive
+        )
+        return
+
+    from app import rate_limiter
+    from rate_limit import MemoryBucketStore
+    if options.workers > 1 and rate_limiter.enabled and isinstance(rate_limiter.store, MemoryBucketStore):
+        logger.warning("Limitation du débit en mémoire avec %s workers : chaque limite est multipliée "
+                       "par le nombre de workers (utilisez RATE_LIMIT_STORE=sqlite:<chemin>)", options.workers)
+
+    def post_fork(server, worker):
+        # Chaque worker ouvre ses propres connexions à la base
+        from app import db
+        with web_app.app_context():
+            db.engine.dispose(close=False)
+
+    class WebApplication(BaseApplication):
+        def load_config(self):
+            settings = {
+                'bind': f"{options.host}:{options.port}",
+                'workers': options.workers,
+                'threads': options.threads,
+                'worker_class': 'gthread',
+                'keepalive': options.keepalive,
+                'timeout': options.timeout,
+                'graceful_timeout': options.graceful_timeout,
+                'preload_app': True,  # Calibrage du hachage et import faits une seule fois
+                'post_fork': post_fork,
+                'accesslog': None,
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return web_app
+
+    logger.info("Serveur web (gunicorn) sur http://%s:%s, %s workers x %s threads",
+                options.host, options.port, options.workers, options.threads)
+    WebApplication().run()
+
+def serve_production(options):
+    """Serveur WSGI de production, bot Discord dans son propre processus"""
+    # Lu par app.py : réglages par défaut partagés entre workers (ex: limitation du débit)
+    os.environ['SERVE_MODE'] = 'production'
+    from app import app as web_app, db
+    from template_cache import precompile_templates
+    with web_app.app_context():
+        db.create_all()
+    # Gabarits compilés avant le fork : aucun worker ne compile à sa première requête
+    precompile_templates(web_app)
+
+    bot_process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', 'bot'])
+    main_pid = os.getpid()
+    try:
+        # Bloque jusqu'à l'arrêt : SIGTERM termine les requêtes en cours (graceful_timeout)
+        serve_wsgi(web_app, options)
+    except KeyboardInterrupt:
+        logger.info("Arrêt en cours...")
+    finally:
+        # Les workers gunicorn sont forkés depuis serve_wsgi et sortent aussi par ici
+        if os.getpid() == main_pid:
+            logger.info("Arrêt du bot...")
+            bot_process.terminate()
+            try:
+                bot_process.wait(options.graceful_timeout)
+            except subprocess.TimeoutExpired:
+                bot_process.kill()
+            logger.info("Arrêt du programme")
+
+def parse_args(argv=None):
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Lance le site et le bot Discord")
+    parser.add_argument('--serve', choices=['dev', 'production', 'bot'], default=os.getenv('SERVE_MODE', 'dev'),
+                        help="dev: serveur Flask dans un thread ; production: serveur WSGI multi-workers "
+                             "et bot dans son propre processus ; bot: bot seul")
+    parser.add_argument('--host', default=os.getenv('WEB_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('WEB_PORT', '5000')))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_WORKERS', str(2 * cpu_count + 1))),
+                        help="Nombre de processus du serveur web")
+    parser.add_argument('--threads', type=int, default=int(os.getenv('WEB_THREADS', '4')),
+                        help="Nombre de threads par processus")
+    parser.add_argument('--keepalive', type=int, default=int(os.getenv('WEB_KEEPALIVE', '5')),
+                        help="Durée de conservation des connexions inactives (secondes)")
+    parser.add_argument('--timeout', type=int, default=int(os.getenv('WEB_TIMEOUT', '30')),
+                        help="Durée maximale d'une requête avant redémarrage du worker (secondes)")
+    parser.add_argument('--graceful-timeout', type=int, default=int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30')),
+                        help="Délai laissé aux requêtes en cours à l'arrêt (secondes)")
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
+    options = parse_args()
+
+    if options.serve == 'production':
+        serve_production(options)
+        sys.exit(0)
+
+    if options.serve == 'bot':
+        run_bot_process()
+        sys.exit(0)
+
     # Démarrer le serveur web dans un thread séparé
-    web_thread = threading.Thread(target=run_web)
+    web_thread = threading.Thread(target=run_web, args=(options.host, options.port))
     web_thread.daemon = True
     web_thread.start()
-    
-    logger.info("Serveur web démarré sur http://localhost:5000")
-    
+
+    logger.info("Serveur web démarré sur http://localhost:%s", options.port)
+
     # Démarrer le bot Discord dans le thread principal
     try:
         run_async(run_bot())
     except KeyboardInterrupt:
         logger.info("Arrêt en cours...")
     except Exception as e:
-        logger.error(f"Erreur inattendue: {e}")
+        logger.error("Erreur inattendue: %s", e)
     finally:
         logger.info("Arrêt du programme")
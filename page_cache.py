@@ -0,0 +1,134 @@
+import hashlib
+import time
+from collections import namedtuple
+from typing import Any, Optional
+
+from flask import make_response, render_template, request, session
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from lru_cache import LRUCache
+
+# Page rendue : corps et ETag fort (empreinte du corps, identique dans tous les workers)
+CachedPage = namedtuple('CachedPage', ['body', 'etag'])
+
+
+class RenderCache(LRUCache):
+    """
+    Cache LRU de rendus (pages entières ou fragments de gabarits).
+
+    Borné en nombre d'entrées et en octets ; chaque entrée expire après sa
+    durée de validité (`default_ttl` si aucune n'est donnée). La version du
+    contenu (ex: identifiant du déploiement) fait partie de chaque clé.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024, version: str = '',
+                 default_ttl: Optional[float] = 300):
+        """
+        Args:
+            max_entries: Nombre maximal de rendus gardés
+            max_bytes: Taille totale maximale des rendus gardés (octets)
+            version: Version du contenu (ex: identifiant du déploiement)
+            default_ttl: Durée de validité par défaut d'un rendu (secondes, None = illimitée)
+        """
+        super().__init__(max_entries)
+        self.max_bytes = max_bytes
+        self.version = version
+        self.default_ttl = default_ttl
+        self._bytes = 0
+
+    def get(self, key: tuple) -> Optional[Any]:
+        now = time.monotonic()
+        entry = super().get((self.version,) + key, fresh=lambda entry: entry[2] is None or entry[2] > now)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: tuple, value: Any, size: int, ttl: Optional[float] = None) -> Any:
+        if size > self.max_bytes:
+            return value
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires = time.monotonic() + ttl if ttl else None
+        super().set((self.version,) + key, (value, size, expires))
+        return value
+
+    def _over_limit(self) -> bool:
+        return super()._over_limit() or self._bytes > self.max_bytes
+
+    def _added(self, key: tuple, entry: tuple):
+        self._bytes += entry[1]
+
+    def _removed(self, key: tuple, entry: tuple):
+        self._bytes -= entry[1]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {**super().stats(), 'bytes': self._bytes, 'version': self.version}
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Balise Jinja {% cache nom[, durée] %}...{% endcache %} : le bloc n'est
+    rendu qu'une fois puis servi depuis environment.fragment_cache (RenderCache).
+
+        {% cache 'menu-' ~ current_user.role, 300 %} ... {% endcache %}
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cache_support', args), [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, name, ttl, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        key = ('fragment', str(name))
+        markup = cache.get(key)
+        if markup is None:
+            markup = caller()
+            cache.set(key, markup, len(markup), ttl)
+        return markup
+
+
+def context_digest(context: dict) -> str:
+    """Empreinte du contexte d'un rendu, pour qu'il fasse partie de la clé"""
+    if not context:
+        return ''
+    return hashlib.sha256(repr(sorted(context.items())).encode('utf-8')).hexdigest()[:16]
+
+
+def render_cached(cache: RenderCache, template: str, scope: str, **context):
+    """
+    Rend un gabarit via le cache de pages, avec ETag fort et réponse 304.
+
+    La clé est (gabarit, portée, contexte, version du contenu) : `scope`
+    identifie l'utilisateur et l'état de sa ligne, ou son rôle pour un gabarit
+    sans aucune donnée personnelle. Les valeurs du contexte doivent avoir une
+    représentation (repr) stable. Les pages avec messages flash en attente ne
+    sont jamais mises en cache.
+    """
+    if session.get('_flashes'):
+        response = make_response(render_template(template, **context))
+    else:
+        key = ('page', template, scope, context_digest(context))
+        page = cache.get(key)
+        if page is None:
+            body = render_template(template, **context).encode('utf-8')
+            page = cache.set(key, CachedPage(body, hashlib.sha256(body).hexdigest()[:32]), len(body))
+        response = make_response(page.body)
+        response.set_etag(page.etag)
+
+    # Page propre à l'utilisateur (ou à son rôle) : revalidée à chaque visite, jamais partagée
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response.make_conditional(request)
@@ -0,0 +1,114 @@
+import hmac
+import time
+import hashlib
+import logging
+from typing import Tuple
+
+from werkzeug.security import check_password_hash
+
+logger = logging.getLogger(__name__)
+
+# Paramètres de scrypt utilisés par Werkzeug (n est calibré)
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Pas de quantification des itérations pbkdf2 calibrées : deux démarrages (ou
+# deux machines) dont les mesures diffèrent de quelques % choisissent le même coût
+PBKDF2_STEP = 100000
+
+# Un hachage n'est refait que si son coût est nettement sous la politique
+REHASH_RATIO = 0.8
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """
+    Vérifie un mot de passe, y compris les anciens hachages « sha256$sel$hmac »
+    créés avec method='sha256', que Werkzeug ne sait plus vérifier.
+    """
+    method, _, rest = password_hash.partition('$')
+    if method == 'sha256':
+        salt, _, expected = rest.partition('$')
+        actual = hmac.new(salt.encode(), password.encode(), 'sha256').hexdigest()
+        return hmac.compare_digest(actual, expected)
+    return check_password_hash(password_hash, password)
+
+
+def _parse_method(method: str) -> Tuple[str, str, int]:
+    """(algorithme, empreinte, coût) d'une méthode Werkzeug, ex: pbkdf2:sha256:600000"""
+    algorithm, *params = method.split(':')
+    if algorithm == 'pbkdf2':
+        digest = params[0] if params else 'sha256'
+        return algorithm, digest, int(params[1]) if len(params) > 1 else 0
+    if algorithm == 'scrypt':
+        return algorithm, '', int(params[0]) if params else 0
+    return algorithm, '', 0
+
+
+def _best_of(func, runs: int = 3) -> float:
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate_pbkdf2(target_ms: float, digest: str = 'sha256', min_iterations: int = 100000,
+                     max_iterations: int = 5000000) -> int:
+    """Nombre d'itérations pbkdf2 pour qu'une vérification dure environ target_ms sur cette machine"""
+    probe = 20000
+    elapsed = _best_of(lambda: hashlib.pbkdf2_hmac(digest, b'calibration', b'0123456789abcdef', probe))
+    iterations = int(probe * target_ms / 1000 / elapsed) // PBKDF2_STEP * PBKDF2_STEP
+    return max(min_iterations, min(iterations, max_iterations))
+
+
+def calibrate_scrypt(target_ms: float, min_n: int = 2 ** 14, max_n: int = 2 ** 20) -> int:
+    """Plus grand n de scrypt (puissance de 2) dont le calcul reste sous target_ms"""
+    n = min_n
+    while n < max_n:
+        candidate = n * 2
+        elapsed = _best_of(lambda: hashlib.scrypt(
+            b'calibration', salt=b'0123456789abcdef', n=candidate, r=SCRYPT_R, p=SCRYPT_P,
+            maxmem=132 * candidate * SCRYPT_R * SCRYPT_P
+        ), runs=1)
+        if elapsed * 1000 > target_ms:
+            break
+        n = candidate
+    return n
+
+
+class PasswordPolicy:
+    """
+    Méthode de hachage des mots de passe en vigueur.
+
+    Les paramètres (algorithme, coût) sont inscrits dans chaque hachage par
+    Werkzeug ; un hachage d'un autre algorithme ou d'un coût nettement
+    inférieur à la politique (moins de REHASH_RATIO) est refait à la prochaine
+    connexion réussie.
+    """
+
+    def __init__(self, method: str):
+        """
+        Args:
+            method: Méthode Werkzeug, ex: pbkdf2:sha256:600000 ou scrypt:32768:8:1
+        """
+        self.method = method
+        self.algorithm, self.digest, self.cost = _parse_method(method)
+
+    @classmethod
+    def calibrated(cls, algorithm: str = 'pbkdf2', target_ms: float = 250,
+                   min_iterations: int = 100000) -> 'PasswordPolicy':
+        """Mesure cette machine et choisit le coût qui donne une vérification d'environ target_ms"""
+        start = time.perf_counter()
+        if algorithm == 'scrypt':
+            policy = cls(f"scrypt:{calibrate_scrypt(target_ms)}:{SCRYPT_R}:{SCRYPT_P}")
+        else:
+            policy = cls(f"pbkdf2:sha256:{calibrate_pbkdf2(target_ms, min_iterations=min_iterations)}")
+        logger.info("Hachage des mots de passe calibré en %.0f ms: %s (cible %s ms)",
+                    (time.perf_counter() - start) * 1000, policy.method, target_ms)
+        return policy
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Indique si un hachage stocké est nettement plus faible que la politique"""
+        algorithm, digest, cost = _parse_method(password_hash.partition('$')[0])
+        return algorithm != self.algorithm or digest != self.digest or cost < self.cost * REHASH_RATIO
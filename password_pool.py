@@ -0,0 +1,143 @@
+import os
+import time
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List
+
+from werkzeug.security import generate_password_hash
+
+from password_policy import verify_password
+
+
+class PasswordPoolError(Exception):
+    """Hachage impossible pour l'instant (file pleine ou délai dépassé)"""
+
+
+class PasswordPoolBusy(PasswordPoolError):
+    """Trop de hachages en attente : la requête est refusée au lieu d'attendre"""
+
+
+class PasswordPoolTimeout(PasswordPoolError):
+    """Le hachage n'a pas été obtenu dans le délai imparti"""
+
+
+class PasswordPool:
+    """
+    Pool dédié au hachage et à la vérification des mots de passe.
+
+    Le calcul (KDF coûteuse) est fait par un nombre borné de threads ou de
+    processus : un afflux de connexions ne mobilise pas tous les threads du
+    serveur et au-delà de `max_queue` demandes en attente, les nouvelles sont
+    refusées immédiatement (PasswordPoolBusy). Les threads suffisent pour
+    pbkdf2 et scrypt, dont le calcul libère le GIL.
+    """
+
+    def __init__(self, workers: int = None, max_queue: int = 64, timeout: float = 5,
+                 use_processes: bool = False):
+        """
+        Args:
+            workers: Nombre de threads ou processus de calcul (par défaut: nombre de CPU)
+            max_queue: Nombre maximal de demandes en cours ou en attente
+            timeout: Délai maximal d'attente d'un résultat (secondes)
+            use_processes: Utiliser des processus plutôt que des threads
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.use_processes = use_processes
+        self._executor: Executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.calls = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._total_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        # Créé à la première utilisation : le serveur peut forker ses workers avant
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.use_processes:
+                        self._executor = ProcessPoolExecutor(self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password')
+        return self._executor
+
+    def _acquire(self, count: int = 1):
+        with self._lock:
+            if self.pending + count > self.max_queue:
+                self.rejected += count
+                raise PasswordPoolBusy(f"{self.pending} hachages en attente")
+            self.pending += count
+
+    def _release(self, count: int, elapsed: float, completed: int):
+        with self._lock:
+            self.pending -= count
+            self.calls += 1
+            self.completed += completed
+            self._total_seconds += elapsed
+
+    def _run(self, func, calls: List[tuple]) -> list:
+        self._acquire(len(calls))
+        start = time.perf_counter()
+        futures = []
+        done = 0
+        try:
+            executor = self._get_executor()
+            futures = [executor.submit(func, *args, **kwargs) for args, kwargs in calls]
+            deadline = start + self.timeout
+            results = []
+            for future in futures:
+                results.append(future.result(timeout=max(0.0, deadline - time.perf_counter())))
+                done += 1
+            return results
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            for future in futures:
+                future.cancel()
+            raise PasswordPoolTimeout(f"Hachage non obtenu en {self.timeout}s")
+        finally:
+            self._release(len(calls), time.perf_counter() - start, done)
+
+    def hash(self, password: str, **options) -> str:
+        """Équivalent de generate_password_hash, calculé dans le pool"""
+        return self._run(generate_password_hash, [((password,), options)])[0]
+
+    def hash_many(self, passwords: List[str], **options) -> List[str]:
+        """
+        Hache plusieurs mots de passe, par groupes calculés en parallèle (un
+        groupe n'occupe jamais plus de places que le pool n'a de workers, ni
+        plus que la file n'en accepte)
+        """
+        hashes = []
+        chunk_size = max(1, min(self.workers, self.max_queue))
+        for start in range(0, len(passwords), chunk_size):
+            chunk = passwords[start:start + chunk_size]
+            hashes += self._run(generate_password_hash, [((password,), options) for password in chunk])
+        return hashes
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Équivalent de check_password_hash (et anciens hachages sha256), calculé dans le pool"""
+        return self._run(verify_password, [((password_hash, password), {})])[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'kind': 'process' if self.use_processes else 'thread',
+                'queue_depth': self.pending,
+                'max_queue': self.max_queue,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'avg_call_ms': self._total_seconds / self.calls * 1000 if self.calls else 0.0,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,120 @@
+from collections import namedtuple
+from typing import Dict, Iterable, List, Tuple
+
+from lru_cache import LRUCache
+
+# Niveau de privilège résolu pour un membre et accès au bot (rôle requis présent)
+Privileges = namedtuple('Privileges', ['level', 'bot_access'])
+
+
+class RoleCache(LRUCache):
+    """
+    Cache des privilèges résolus par (serveur, membre).
+
+    La résolution compare des ensembles d'ID de rôles au lieu de parcourir les
+    rôles du membre à chaque commande. Les entrées sont invalidées par les
+    événements Discord qui peuvent changer le résultat : rôles d'un membre
+    modifiés, rôle suivi modifié ou supprimé, changement de propriétaire.
+    Le cache est vidé à chaque (re)connexion : les événements manqués pendant
+    une déconnexion ne sont pas rejoués après une nouvelle identification.
+    """
+
+    def __init__(self, role_ids: Dict[str, int], access_role_id: int, max_entries: int = 10000):
+        """
+        Args:
+            role_ids: ID des rôles Discord par niveau ('owner', 'admin', 'moderator')
+            access_role_id: ID du rôle requis pour utiliser le bot
+            max_entries: Nombre maximal de membres gardés en cache (LRU)
+        """
+        super().__init__(max_entries)
+        # Ordre de priorité : Owner > Admin > Moderator
+        self._levels = [(level, role_ids[level]) for level in ('owner', 'admin', 'moderator')]
+        self.access_role_id = access_role_id
+        self.tracked_role_ids = frozenset(role_ids.values()) | {access_role_id}
+
+    def resolve(self, member, guild) -> Privileges:
+        """Retourne les privilèges d'un membre dans un serveur"""
+        key = (guild.id, member.id)
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        role_ids = {role.id for role in member.roles}
+
+        if member.id == guild.owner_id:
+            level = 'owner'
+        else:
+            level = next((name for name, role_id in self._levels if role_id in role_ids), 'member')
+
+        entry = Privileges(level, self.access_role_id in role_ids)
+        self.set(key, entry)
+        return entry
+
+    def invalidate_member(self, guild_id: int, member_id: int):
+        self.invalidate((guild_id, member_id))
+
+    def invalidate_guild(self, guild_id: int):
+        for key in self.keys():
+            if key[0] == guild_id:
+                self.invalidate(key)
+
+    def is_tracked(self, role_ids: Iterable[int]) -> bool:
+        """Indique si l'un des rôles influence la résolution des privilèges"""
+        return not self.tracked_role_ids.isdisjoint(role_ids)
+
+
+# Niveaux de rôle du plus bas au plus élevé
+LEVELS = ('member', 'moderator', 'admin', 'owner')
+LEVEL_RANK = {level: rank for rank, level in enumerate(LEVELS)}
+
+# Niveau spécial : propriétaire de l'application Discord du bot (commands.is_owner)
+BOT_OWNER = 'bot_owner'
+
+CommandPermission = namedtuple('CommandPermission', ['level', 'section', 'usage', 'description'])
+
+
+class PermissionRegistry:
+    """
+    Table des permissions des commandes, construite une fois au démarrage.
+
+    Associe chaque commande à son niveau minimal ; la même table est utilisée
+    par la vérification globale des commandes et par l'affichage de !aide.
+    """
+
+    def __init__(self, table: Dict[str, tuple]):
+        """
+        Args:
+            table: nom de commande -> (niveau, section d'aide, utilisation, description) ;
+                   une section None masque la commande dans l'aide
+        """
+        self._commands: Dict[str, CommandPermission] = {}
+        self._sections: Dict[str, list] = {}
+
+        for name, entry in table.items():
+            permission = CommandPermission(*entry)
+            if permission.level != BOT_OWNER and permission.level not in LEVEL_RANK:
+                raise ValueError(f"Niveau inconnu pour la commande {name}: {permission.level}")
+            self._commands[name] = permission
+            if permission.section:
+                self._sections.setdefault(permission.section, []).append(permission)
+
+    def get(self, name: str):
+        """Retourne la permission d'une commande (None si la commande n'est pas déclarée)"""
+        return self._commands.get(name)
+
+    @staticmethod
+    def allows(permission: CommandPermission, level: str) -> bool:
+        """Indique si un niveau de rôle suffit (hors commandes du propriétaire du bot)"""
+        return LEVEL_RANK[level] >= LEVEL_RANK[permission.level]
+
+    def listing(self, level: str) -> List[Tuple[str, List[CommandPermission]]]:
+        """Commandes visibles dans l'aide pour un niveau, groupées par section"""
+        result = []
+        for section, permissions in self._sections.items():
+            visible = [
+                permission for permission in permissions
+                if (level == 'owner' if permission.level == BOT_OWNER else self.allows(permission, level))
+            ]
+            if visible:
+                result.append((section, visible))
+        return result
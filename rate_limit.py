@@ -0,0 +1,187 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import jsonify, make_response, request
+
+from lru_cache import LRUCache
+
+# Règle : nom, fonction qui extrait la clé de la requête (None = non applicable), jetons, période (s)
+Rule = Tuple[str, Callable[[], Optional[str]], float, float]
+
+
+def parse_rate(spec: str) -> Tuple[float, float]:
+    """Analyse un débit "nombre/secondes", ex: "10/60" = 10 requêtes par minute"""
+    count, _, period = spec.partition('/')
+    return float(count), float(period or 1)
+
+
+class MemoryBucketStore:
+    """
+    Seaux à jetons en mémoire, répartis sur plusieurs verrous (shards).
+
+    Les seaux sont remplis paresseusement (calcul au moment de la demande,
+    sans tâche de fond) ; chaque shard garde au plus `max_keys` clés, les moins
+    récemment utilisées étant oubliées (un seau oublié repart plein).
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 10000):
+        """
+        Args:
+            shards: Nombre de partitions (verrous indépendants)
+            max_keys: Nombre maximal de clés par partition
+        """
+        self.max_keys = max_keys
+        self._shards = [LRUCache(max_keys) for _ in range(shards)]
+
+    def take(self, key: str, capacity: float, period: float) -> float:
+        """Prend un jeton ; retourne 0 si la requête est permise, sinon le délai d'attente (s)"""
+        buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        rate = capacity / period
+        with buckets.lock:
+            tokens, updated = buckets.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                buckets.set(key, (tokens - 1, now))
+                retry_after = 0.0
+            else:
+                buckets.set(key, (tokens, now))
+                retry_after = (1 - tokens) / rate
+        return retry_after
+
+
+class SQLiteBucketStore:
+    """
+    Seaux à jetons dans une base SQLite locale, partagés par les workers d'une
+    même machine (mode production). Chaque prise de jeton est une transaction
+    IMMEDIATE ; les seaux inutilisés depuis `idle_ttl` secondes sont purgés.
+    """
+
+    def __init__(self, path: str, idle_ttl: float = 3600):
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self._local = threading.local()
+        self._takes = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Une connexion par thread et par processus (jamais héritée d'un fork)
+        conn, pid = getattr(self._local, 'conn', (None, None))
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = (conn, os.getpid())
+        return conn
+
+    def take(self, key: str, capacity: float, period: float) -> float:
+        conn = self._connection()
+        now = time.time()
+        rate = capacity / period
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            retry_after = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if tokens >= 1:
+                tokens -= 1
+            conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+            self._takes += 1
+            if self._takes % 1000 == 0:
+                conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self.idle_ttl,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+
+def create_store(spec: str):
+    """Store de seaux selon RATE_LIMIT_STORE : "memory" ou "sqlite:<chemin>" """
+    if spec.startswith('sqlite:'):
+        return SQLiteBucketStore(spec[len('sqlite:'):])
+    return MemoryBucketStore()
+
+
+class RateLimiter:
+    """
+    Limitation du débit des points d'accès sensibles, vérifiée avant tout
+    accès à la base ou calcul de hachage.
+
+    Chaque point d'accès a des règles (par IP, par nom d'utilisateur, par clé
+    d'API...) ; la requête est refusée avec 429 et Retry-After dès qu'un des
+    seaux concernés est vide.
+    """
+
+    def __init__(self, store, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited: Dict[str, int] = {}
+
+    def check(self, endpoint: str, rules: List[Rule]) -> float:
+        """Retourne 0 si la requête est permise, sinon le délai avant nouvel essai (s)"""
+        for name, key_func, capacity, period in rules:
+            key = key_func()
+            if key is None:
+                continue
+            retry_after = self.store.take(f"{endpoint}:{name}:{key}", capacity, period)
+            if retry_after > 0:
+                with self._lock:
+                    self.limited[f"{endpoint}:{name}"] = self.limited.get(f"{endpoint}:{name}", 0) + 1
+                return retry_after
+        with self._lock:
+            self.allowed += 1
+        return 0.0
+
+    def limit(self, endpoint: str, rules: List[Rule], methods=('POST',)):
+        """Décorateur de vue : répond 429 avant d'exécuter la vue si le débit est dépassé"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.enabled and request.method in methods:
+                    retry_after = self.check(endpoint, rules)
+                    if retry_after > 0:
+                        return too_many_requests(retry_after)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'allowed': self.allowed, 'limited': dict(self.limited)}
+
+
+def too_many_requests(retry_after: float):
+    message = 'Trop de tentatives, veuillez réessayer plus tard'
+    if request.is_json or request.path.startswith('/api/'):
+        response = make_response(jsonify(error=message), 429)
+    else:
+        response = make_response(message, 429)
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+def client_ip() -> Optional[str]:
+    return request.remote_addr
+
+
+def form_username() -> Optional[str]:
+    username = request.form.get('username')
+    return username.strip().lower() if username else None
+
+
+def api_key() -> Optional[str]:
+    """Empreinte de l'en-tête Authorization (la clé elle-même n'est jamais conservée)"""
+    authorization = request.headers.get('Authorization')
+    return hashlib.sha256(authorization.encode()).hexdigest()[:32] if authorization else None
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark du coût des diagnostics par commande (get_user_role).
+
+Compare l'ancien comportement (print d'une f-string à chaque appel) à la
+journalisation par file de log_config, désactivée (niveau INFO) puis activée
+(niveau DEBUG). Les sorties sont envoyées vers os.devnull.
+
+Utilisation: python scripts/bench_logging.py [nombre_d_appels]
+"""
+import os
+import sys
+import time
+import logging
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_config import setup_logging, stop_logging
+
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+
+class FakeMember:
+    def __init__(self):
+        self.name = 'vexxkawai'
+        self.roles = [FakeRole(i) for i in range(20)] + [FakeRole(1452844583347027981)]
+
+    def __str__(self):
+        return self.name
+
+
+ADMIN_ROLE = 1452844583347027981
+logger = logging.getLogger('bot')
+
+
+def role_with_print(member):
+    for role in member.roles:
+        if role.id == ADMIN_ROLE:
+            print(f"Détection de rôle: {member} a le rôle Admin")
+            return 'admin'
+    return 'member'
+
+
+def role_with_logger(member):
+    for role in member.roles:
+        if role.id == ADMIN_ROLE:
+            logger.debug("Détection de rôle: %s a le rôle Admin", member)
+            return 'admin'
+    return 'member'
+
+
+def measure(func, member, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(member)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    member = FakeMember()
+
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            before = measure(role_with_print, member, calls)
+
+        setup_logging(level='INFO', stream=devnull)
+        disabled = measure(role_with_logger, member, calls)
+
+        logger.setLevel(logging.DEBUG)
+        enabled = measure(role_with_logger, member, calls)
+        stop_logging()
+
+    print(f"{calls} appels de get_user_role")
+    print(f"  avant (print)            : {before:.3f} µs/appel")
+    print(f"  après, DEBUG désactivé   : {disabled:.3f} µs/appel")
+    print(f"  après, DEBUG activé      : {enabled:.3f} µs/appel")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Test de charge des connexions simultanées sur users.db (app.py).
+
+Plusieurs threads envoient POST /login pendant qu'un thread crée des comptes
+en continu, comme le serveur web lancé à côté du bot. Le test est exécuté
+deux fois, dans un processus séparé : avec les réglages SQLite par défaut
+(journal DELETE, synchronous FULL, sans busy_timeout) puis avec le profil
+de sqlite_profile. Les mots de passe utilisent un hachage peu coûteux (sans
+rehachage à la connexion) et la limitation du débit est désactivée, pour
+mesurer la base plutôt que le hachage ou le limiteur.
+
+Utilisation: python scripts/bench_login.py [threads] [durée_en_secondes]
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PROFILES = {
+    'défaut': 'journal_mode=DELETE,synchronous=FULL,busy_timeout=0,mmap_size=0,cache_size=-2000,temp_store=DEFAULT',
+    'profil': '',
+}
+
+USERS = 200
+
+# Coût de hachage des comptes de test, aussi imposé à l'application (pas de rehachage)
+PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+
+
+def run(threads, duration):
+    """Exécute la charge dans ce processus (base et pragmas définis par l'environnement)"""
+    from werkzeug.security import generate_password_hash
+    from app import app, db, User, create_user
+
+    password_hash = generate_password_hash('motdepasse', method=PASSWORD_HASH_METHOD)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            User(username=f'user{i}', email=f'user{i}@discord.app', password=password_hash)
+            for i in range(USERS)
+        )
+        db.session.commit()
+
+    stop = time.perf_counter() + duration
+    counts = {'logins': 0, 'errors': 0, 'signups': 0}
+    lock = threading.Lock()
+
+    def login_worker(worker):
+        client = app.test_client()
+        logins = errors = 0
+        i = worker
+        while time.perf_counter() < stop:
+            response = client.post('/login', data={'username': f'user{i % USERS}', 'password': 'motdepasse'})
+            # Seule la redirection après connexion compte comme une connexion réussie
+            if response.status_code == 302:
+                logins += 1
+            else:
+                errors += 1
+            i += threads
+        with lock:
+            counts['logins'] += logins
+            counts['errors'] += errors
+
+    def signup_worker():
+        i = 0
+        with app.app_context():
+            while time.perf_counter() < stop:
+                try:
+                    create_user(User(username=f'new{i}', email=f'new{i}@discord.app', password=password_hash))
+                    counts['signups'] += 1
+                except Exception:
+                    db.session.rollback()
+                    counts['errors'] += 1
+                i += 1
+
+    app.logger.disabled = True
+    workers = [threading.Thread(target=login_worker, args=(n,)) for n in range(threads)]
+    workers.append(threading.Thread(target=signup_worker))
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    print(f"{counts['logins'] / duration:.0f} {counts['errors']} {counts['signups'] / duration:.0f}")
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"{threads} threads de connexion + 1 thread d'inscription, {duration:.0f}s par profil")
+    for name, pragmas in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                FLASK_DATABASE_URI=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                SQLITE_PRAGMAS=pragmas,
+                PASSWORD_HASH_METHOD=PASSWORD_HASH_METHOD,
+                RATE_LIMIT_ENABLED='0'
+            )
+            output = subprocess.run(
+                [sys.executable, __file__, '--run', str(threads), str(duration)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout.split()
+        logins, errors, signups = output[-3:]
+        print(f"  {name:7}: {logins:>6} connexions/s, {signups:>5} inscriptions/s, {errors} erreurs")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        run(int(sys.argv[2]), float(sys.argv[3]))
+    else:
+        main()
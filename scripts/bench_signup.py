@@ -0,0 +1,73 @@
+"""
+Benchmark des inscriptions par seconde (app.py).
+
+Compare l'ancienne validation (un SELECT par colonne unique puis INSERT) à
+create_user (INSERT seul, doublons détectés par les contraintes de la base),
+pour des comptes nouveaux puis pour des doublons. Le mot de passe est haché
+une seule fois : seul le coût des allers-retours avec la base est mesuré.
+
+Utilisation: python scripts/bench_signup.py [nombre_d_inscriptions]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base temporaire, à définir avant l'import de l'application
+_db_dir = tempfile.mkdtemp()
+os.environ['FLASK_DATABASE_URI'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from werkzeug.security import generate_password_hash
+
+from app import app, db, User, UNIQUE_MESSAGES, create_user
+
+PASSWORD_HASH = generate_password_hash('motdepasse')
+
+
+def new_user(prefix, i):
+    return User(
+        username=f'{prefix}{i}',
+        email=f'{prefix}{i}@discord.app',
+        password=PASSWORD_HASH,
+        discord_id=f'{prefix}{i}',
+        role='member'
+    )
+
+
+def signup_before(user):
+    """Ancienne validation : SELECT par colonne, puis INSERT et COMMIT"""
+    for column in ('discord_id', 'username', 'email'):
+        if User.query.filter_by(**{column: getattr(user, column)}).first():
+            return UNIQUE_MESSAGES[column]
+    db.session.add(user)
+    db.session.commit()
+    return None
+
+
+def measure(signup, prefix, count):
+    start = time.perf_counter()
+    for i in range(count):
+        signup(new_user(prefix, i))
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with app.app_context():
+        db.create_all()
+
+        before = measure(signup_before, 'avant', count)
+        after = measure(create_user, 'apres', count)
+        before_dup = measure(signup_before, 'avant', count)
+        after_dup = measure(create_user, 'apres', count)
+
+    print(f"{count} inscriptions (SQLite, {app.config['SQLALCHEMY_DATABASE_URI']})")
+    print(f"  avant (SELECT x3 + INSERT) : {before:8.0f} inscriptions/s, doublons: {before_dup:8.0f}/s")
+    print(f"  après (INSERT seul)        : {after:8.0f} inscriptions/s, doublons: {after_dup:8.0f}/s")
+
+
+if __name__ == '__main__':
+    main()
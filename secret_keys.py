@@ -0,0 +1,107 @@
+"""
+Clés de signature des sessions Flask, partagées par tous les processus.
+
+Les clés viennent de la configuration (SECRET_KEY et SECRET_KEY_FALLBACKS,
+séparées par des virgules) ou d'un fichier de clés : une clé par ligne, la
+première signe les nouveaux cookies, les suivantes sont encore acceptées.
+Le fichier est créé au premier démarrage s'il n'existe pas.
+
+Rotation: python secret_keys.py rotate [fichier] [--keep N]
+"""
+import os
+import sys
+import secrets
+import argparse
+from typing import List, Tuple
+
+# Nombre d'anciennes clés gardées par défaut lors d'une rotation
+DEFAULT_KEEP = 2
+
+
+def new_key() -> str:
+    return secrets.token_hex(32)
+
+
+def read_key_file(path: str) -> List[str]:
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def write_key_file(path: str, keys: List[str]):
+    """Écrit le fichier de clés de façon atomique, lisible par son seul propriétaire"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write("\n".join(keys) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _create_key_file(path: str) -> List[str]:
+    """
+    Crée le fichier avec une nouvelle clé ; si un autre processus l'a créé
+    entre-temps, le lit. La clé est écrite dans un fichier temporaire puis liée
+    au chemin final (os.link échoue si le fichier existe) : le fichier
+    n'apparaît jamais vide.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    keys = [new_key()]
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(keys[0] + "\n")
+        os.link(tmp_path, path)
+    except FileExistsError:
+        return read_key_file(path)
+    finally:
+        os.unlink(tmp_path)
+    return keys
+
+
+def load_secret_keys(key_file: str) -> Tuple[str, List[str]]:
+    """
+    Retourne (clé actuelle, anciennes clés acceptées).
+
+    SECRET_KEY (et SECRET_KEY_FALLBACKS) de l'environnement sont prioritaires ;
+    sinon les clés sont lues dans `key_file`, créé s'il n'existe pas.
+    """
+    if os.getenv('SECRET_KEY'):
+        fallbacks = [key.strip() for key in os.getenv('SECRET_KEY_FALLBACKS', '').split(',') if key.strip()]
+        return os.environ['SECRET_KEY'], fallbacks
+
+    try:
+        keys = read_key_file(key_file)
+    except FileNotFoundError:
+        keys = _create_key_file(key_file)
+    if not keys:
+        raise RuntimeError(f"Aucune clé dans {key_file}")
+    return keys[0], keys[1:]
+
+
+def rotate(key_file: str, keep: int = DEFAULT_KEEP) -> str:
+    """Ajoute une nouvelle clé de signature ; l'ancienne reste acceptée jusqu'aux `keep` rotations suivantes"""
+    try:
+        keys = read_key_file(key_file)
+    except FileNotFoundError:
+        keys = []
+    keys = [new_key()] + keys[:keep]
+    write_key_file(key_file, keys)
+    return keys[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gestion des clés de signature des sessions")
+    parser.add_argument('command', choices=['rotate'])
+    parser.add_argument('key_file', nargs='?', default=os.getenv('SECRET_KEY_FILE', os.path.join('instance', 'secret_key')))
+    parser.add_argument('--keep', type=int, default=DEFAULT_KEEP, help="Nombre d'anciennes clés gardées")
+    options = parser.parse_args(argv)
+
+    rotate(options.key_file, options.keep)
+    print(f"Nouvelle clé de signature écrite dans {options.key_file} "
+          f"({options.keep} ancienne(s) clé(s) au plus encore acceptée(s)). Redémarrez le serveur.")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
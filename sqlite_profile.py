@@ -0,0 +1,68 @@
+import os
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Réglages appliqués à chaque connexion SQLite (surchargés par SQLITE_PRAGMAS)
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',          # Lecteurs et écrivain ne se bloquent plus mutuellement
+    'synchronous': 'NORMAL',        # Sûr en WAL, un fsync par checkpoint au lieu d'un par transaction
+    'busy_timeout': '5000',         # Attendre un verrou (ms) au lieu d'échouer avec "database is locked"
+    'mmap_size': str(256 * 1024 * 1024),  # Lectures par projection mémoire (octets)
+    'cache_size': str(-64 * 1024),  # Cache de pages par connexion (valeur négative = Kio)
+    'temp_store': 'MEMORY',
+}
+
+
+def parse_pragmas(spec: str) -> Dict[str, str]:
+    """Analyse une liste de pragmas, ex: "synchronous=FULL,mmap_size=0" """
+    pragmas = {}
+    for item in spec.split(','):
+        name, sep, value = item.partition('=')
+        if sep and name.strip():
+            pragmas[name.strip().lower()] = value.strip()
+    return pragmas
+
+
+def pragmas_from_env() -> Dict[str, str]:
+    return {**DEFAULT_PRAGMAS, **parse_pragmas(os.getenv('SQLITE_PRAGMAS', ''))}
+
+
+def is_sqlite_file(uri: str) -> bool:
+    return uri.startswith('sqlite') and ':memory:' not in uri and not uri.rstrip('/').endswith(':')
+
+
+def engine_options(uri: str) -> dict:
+    """
+    Options de moteur SQLAlchemy adaptées à un serveur multi-thread.
+
+    Pour une base SQLite sur disque : connexions partageables entre threads
+    et pool borné (FLASK_DB_POOL_SIZE, FLASK_DB_MAX_OVERFLOW, FLASK_DB_POOL_TIMEOUT).
+    """
+    if not uri.startswith('sqlite'):
+        return {'pool_pre_ping': True}
+    if not is_sqlite_file(uri):
+        return {}
+    return {
+        'connect_args': {'check_same_thread': False},
+        'pool_size': int(os.getenv('FLASK_DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('FLASK_DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': float(os.getenv('FLASK_DB_POOL_TIMEOUT', '30')),
+    }
+
+
+def install(engine: Engine, pragmas: Optional[Dict[str, str]] = None):
+    """Applique les pragmas à chaque nouvelle connexion du moteur (bases SQLite uniquement)"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = pragmas_from_env() if pragmas is None else pragmas
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
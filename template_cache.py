@@ -0,0 +1,41 @@
+import os
+import time
+import logging
+from typing import Dict
+
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+logger = logging.getLogger(__name__)
+
+
+def install_bytecode_cache(app, directory: str):
+    """
+    Garde le code compilé des gabarits sur disque : un nouveau worker charge
+    le bytecode au lieu de recompiler chaque gabarit (invalidé si le gabarit change).
+    """
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def precompile_templates(app) -> Dict[str, float]:
+    """
+    Charge tous les gabarits de l'application (dossier de l'app et des blueprints)
+    pour que la première requête n'ait rien à compiler.
+
+    Returns:
+        Durée de chargement de chaque gabarit (ms)
+    """
+    timings = {}
+    start = time.perf_counter()
+    for name in app.jinja_env.list_templates():
+        template_start = time.perf_counter()
+        try:
+            app.jinja_env.get_template(name)
+        except TemplateError as e:
+            logger.error("Gabarit %s invalide: %s", name, e)
+            continue
+        timings[name] = (time.perf_counter() - template_start) * 1000
+        logger.debug("Gabarit %s chargé en %.1f ms", name, timings[name])
+
+    logger.info("%s gabarits préchargés en %.0f ms", len(timings), (time.perf_counter() - start) * 1000)
+    return timings
@@ -0,0 +1,93 @@
+import os
+import time
+import secrets
+import threading
+from typing import Any, Optional
+
+from lru_cache import LRUCache
+
+
+class UserCache(LRUCache):
+    """
+    Cache des utilisateurs chargés par Flask-Login (user_loader), par ID.
+
+    Les entrées sont des copies détachées de la ligne : le serveur les
+    rattache à la session de la requête sans requête SQL. Une entrée expire
+    après `ttl` secondes (modifications faites hors de l'application) et est
+    invalidée dès qu'une modification de l'utilisateur est validée.
+
+    Avec plusieurs processus (--serve production), `shared_file` propage les
+    invalidations : il contient un jeton de génération de taille fixe,
+    remplacé atomiquement à chaque modification validée ; un processus qui
+    voit le jeton changer vide tout son cache.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60, shared_file: Optional[str] = None):
+        """
+        Args:
+            max_entries: Nombre maximal d'utilisateurs gardés en cache (LRU)
+            ttl: Durée de validité d'une entrée (secondes, 0 = cache désactivé)
+            shared_file: Fichier de génération partagé par les processus (None = invalidation locale)
+        """
+        super().__init__(max_entries)
+        self.ttl = ttl
+        self.shared_file = shared_file
+        if shared_file:
+            os.makedirs(os.path.dirname(shared_file) or '.', exist_ok=True)
+        self._generation = self._shared_generation()
+        self.remote_invalidations = 0
+
+    def _shared_generation(self) -> Optional[str]:
+        if not self.shared_file:
+            return None
+        try:
+            with open(self.shared_file, encoding='ascii') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _publish_generation(self) -> str:
+        """Écrit un nouveau jeton (fichier temporaire puis os.replace : jamais lu à moitié)"""
+        generation = secrets.token_hex(8)
+        tmp_path = f"{self.shared_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='ascii') as f:
+            f.write(generation)
+        os.replace(tmp_path, self.shared_file)
+        return generation
+
+    def get(self, user_id: int) -> Optional[Any]:
+        generation = self._shared_generation()
+        with self.lock:
+            if generation != self._generation:
+                # Un autre processus a modifié un utilisateur : tout est à relire
+                self._generation = generation
+                if len(self):
+                    self.clear()
+                    self.remote_invalidations += 1
+            now = time.monotonic()
+            entry = super().get(user_id, fresh=lambda entry: now - entry[1] < self.ttl)
+            return entry[0] if entry is not None else None
+
+    def set(self, user_id: int, user: Any):
+        if self.ttl <= 0:
+            return
+        super().set(user_id, (user, time.monotonic()))
+
+    def invalidate(self, *user_ids: int, shared: bool = True):
+        """
+        Oublie des utilisateurs ; avec `shared`, les autres processus videront
+        leur cache (à appeler une fois, après la validation de la modification).
+        """
+        for user_id in user_ids:
+            super().invalidate(user_id)
+        if not (shared and self.shared_file and user_ids):
+            return
+        previous = self._shared_generation()
+        generation = self._publish_generation()
+        with self.lock:
+            # Ce processus n'a rien à relire, sauf si un autre avait publié entre-temps
+            if previous == self._generation:
+                self._generation = generation
+
+    def stats(self) -> dict:
+        return {**super().stats(), 'remote_invalidations': self.remote_invalidations}
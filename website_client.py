@@ -0,0 +1,482 @@
+import json as json_module
+import time
+import random
+import asyncio
+import logging
+from collections import namedtuple
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import aiohttp
+from yarl import URL
+
+from lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Réponse de l'API : code HTTP et corps (JSON décodé, ou texte brut)
+WebsiteResponse = namedtuple('WebsiteResponse', ['status', 'data'])
+
+# Page de logs du site : entrées et curseur de la page suivante (None s'il n'y en a plus)
+LogPage = namedtuple('LogPage', ['entries', 'next_cursor'])
+
+# Délais maximaux par point d'accès (secondes)
+DEFAULT_TIMEOUTS = {
+    'logs': 10,
+    'stats': 5,
+    'users': 5,
+    'register': 15,
+    'register_batch': 60,
+}
+
+# Durée de fraîcheur des réponses mises en cache par point d'accès (secondes)
+DEFAULT_CACHE_TTLS = {
+    'stats': 30,
+    'users': 60,
+}
+
+# Codes HTTP considérés comme une indisponibilité du site
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class WebsiteError(Exception):
+    """Échec d'un appel à l'API du site (réseau, délai dépassé, site indisponible)"""
+
+
+class CircuitOpenError(WebsiteError):
+    """Appel refusé immédiatement : le site est considéré comme hors service"""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur par hôte : après `failure_threshold` échecs consécutifs, les
+    appels échouent immédiatement pendant `reset_timeout` secondes, puis un
+    seul appel d'essai est autorisé pour tester le retour du site.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == 'closed':
+            return True
+        if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+            return True
+        return False
+
+    def record_success(self):
+        self.state = 'closed'
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                logger.warning("API du site indisponible, appels suspendus pendant %ss", self.reset_timeout)
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """Appel d'essai abandonné sans résultat (annulation) : un autre appel pourra le refaire"""
+        if self.state == 'half_open':
+            self.state = 'open'
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class ResponseCache(LRUCache):
+    """
+    Cache LRU des réponses de l'API, par point d'accès et paramètres.
+
+    Une entrée est fraîche pendant le TTL de son point d'accès, puis périmée
+    pendant `stale_ttl` secondes : elle est encore servie immédiatement, le
+    temps qu'un rafraîchissement en arrière-plan la remplace.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, stale_ttl: float = 300,
+                 max_entries: int = 256):
+        """
+        Args:
+            ttls: Durée de fraîcheur par point d'accès (remplacent DEFAULT_CACHE_TTLS)
+            stale_ttl: Durée pendant laquelle une entrée périmée peut encore être servie
+            max_entries: Nombre maximal d'entrées gardées en cache (LRU)
+        """
+        super().__init__(max_entries)
+        self.ttls = {**DEFAULT_CACHE_TTLS, **(ttls or {})}
+        self.stale_ttl = stale_ttl
+        self.stale_hits = 0
+
+    def get(self, key: tuple) -> Optional[Tuple[WebsiteResponse, bool]]:
+        """Retourne (réponse, fraîche) ou None si l'entrée est absente ou trop ancienne"""
+        now = time.monotonic()
+        entry = super().get(key, fresh=lambda entry: now - entry[1] < self.ttls.get(entry[2], 0) + self.stale_ttl)
+        if entry is None:
+            return None
+
+        response, stored_at, endpoint = entry
+        if now - stored_at < self.ttls.get(endpoint, 0):
+            return response, True
+        self.stale_hits += 1
+        return response, False
+
+    def set(self, key: tuple, endpoint: str, response: WebsiteResponse):
+        super().set(key, (response, time.monotonic(), endpoint))
+
+    def stats(self) -> dict:
+        # Les succès de LRUCache comptent aussi les réponses périmées servies
+        stats = super().stats()
+        stats['hits'] -= self.stale_hits
+        stats['stale_hits'] = self.stale_hits
+        return stats
+
+
+class ConnectionStats:
+    """Compteurs de réutilisation des connexions HTTP, alimentés par les traces aiohttp"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._count('requests'))
+        trace.on_connection_create_end.append(self._count('connections_created'))
+        trace.on_connection_reuseconn.append(self._count('connections_reused'))
+        trace.on_dns_cache_hit.append(self._count('dns_cache_hits'))
+        trace.on_dns_cache_miss.append(self._count('dns_cache_misses'))
+        return trace
+
+    def _count(self, counter: str):
+        async def callback(session, trace_config_ctx, params):
+            setattr(self, counter, getattr(self, counter) + 1)
+        return callback
+
+    def as_dict(self) -> dict:
+        connections = self.connections_created + self.connections_reused
+        return {
+            'requests': self.requests,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'reuse_ratio': self.connections_reused / connections if connections else 0.0,
+            'dns_cache_hits': self.dns_cache_hits,
+            'dns_cache_misses': self.dns_cache_misses,
+        }
+
+
+class WebsiteClient:
+    """
+    Client de l'API du site utilisé par toutes les commandes du bot.
+
+    Une seule session aiohttp longue durée est créée au démarrage du bot
+    (setup_hook) et fermée à l'arrêt : les connexions restent ouvertes
+    (keep-alive) dans un pool borné et les résolutions DNS sont mises en cache.
+    Chaque appel a un délai maximal propre à son point d'accès, les GET sont
+    réessayés avec un délai aléatoire croissant, un disjoncteur par hôte évite
+    d'attendre un site hors service et un sémaphore borne les appels simultanés.
+    Les statistiques et les fiches utilisateur sont servies depuis un cache
+    (ResponseCache), rafraîchi en arrière-plan lorsqu'il est périmé, et les
+    lectures identiques simultanées partagent un seul appel au site.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 register_url: str = 'http://localhost:3000/api/discord/register',
+                 register_api_key: Optional[str] = None,
+                 register_batch_url: Optional[str] = None,
+                 pool_size: int = 20, pool_size_per_host: int = 10,
+                 dns_cache_ttl: int = 300, keepalive_timeout: float = 30,
+                 timeout: float = 10, connect_timeout: float = 5,
+                 timeouts: Optional[Dict[str, float]] = None, max_retries: int = 2,
+                 retry_backoff: float = 0.5, max_concurrency: int = 10,
+                 failure_threshold: int = 5, reset_timeout: float = 30,
+                 cache_ttls: Optional[Dict[str, float]] = None, cache_stale_ttl: float = 300,
+                 cache_size: int = 256):
+        """
+        Args:
+            base_url: URL de base de l'API du site (WEBSITE_API_URL)
+            api_key: Clé de l'API du site (WEBSITE_API_KEY)
+            register_url: URL d'enregistrement des comptes Discord
+            register_api_key: Clé de l'API d'enregistrement (API_KEY)
+            register_batch_url: URL d'enregistrement groupé (par défaut register_url + '/batch')
+            pool_size: Nombre maximal de connexions ouvertes
+            pool_size_per_host: Nombre maximal de connexions vers un même hôte
+            dns_cache_ttl: Durée de cache des résolutions DNS (secondes)
+            keepalive_timeout: Durée de conservation d'une connexion inactive (secondes)
+            timeout: Délai maximal d'une requête complète (secondes)
+            connect_timeout: Délai maximal d'établissement de la connexion (secondes)
+            timeouts: Délais maximaux par point d'accès (remplacent DEFAULT_TIMEOUTS)
+            max_retries: Nombre de nouvelles tentatives pour les GET
+            retry_backoff: Délai de base entre deux tentatives (secondes)
+            max_concurrency: Nombre maximal d'appels simultanés au site
+            failure_threshold: Échecs consécutifs avant ouverture du disjoncteur
+            reset_timeout: Durée d'ouverture du disjoncteur (secondes)
+            cache_ttls: Durée de fraîcheur des réponses en cache par point d'accès
+            cache_stale_ttl: Durée pendant laquelle une réponse périmée reste servie
+            cache_size: Nombre maximal de réponses gardées en cache
+        """
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.api_key = api_key
+        self.register_url = register_url
+        self.register_api_key = register_api_key
+        self.register_batch_url = register_batch_url or f"{register_url.rstrip('/')}/batch"
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.cache = ResponseCache(cache_ttls, cache_stale_ttl, cache_size)
+        self._refreshing: Dict[tuple, asyncio.Task] = {}
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self.coalesced = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.stats = ConnectionStats()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        """Crée la session partagée (idempotent)"""
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            trace_configs=[self.stats.trace_config()]
+        )
+        logger.debug("Session HTTP partagée créée (pool: %s, par hôte: %s)", self.pool_size, self.pool_size_per_host)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("La session HTTP du site n'est pas démarrée")
+        return self._session
+
+    async def close(self):
+        """Ferme la session et les connexions du pool"""
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def configured(self) -> bool:
+        """Indique si l'URL et la clé de l'API du site sont configurées"""
+        return bool(self.base_url and self.api_key)
+
+    def breaker_states(self) -> Dict[str, str]:
+        return {host: breaker.state for host, breaker in self._breakers.items()}
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        host = URL(url).host or url
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    async def request(self, method: str, url: str, endpoint: str,
+                      headers: Optional[dict] = None, json: Optional[dict] = None) -> WebsiteResponse:
+        """
+        Effectue un appel à l'API du site.
+
+        Seuls les GET (idempotents) sont réessayés. Lève CircuitOpenError si le
+        site est considéré comme hors service, WebsiteError en cas d'échec réseau
+        ou de délai dépassé ; les réponses HTTP (y compris 4xx/5xx) sont retournées.
+        """
+        session = self.session
+        breaker = self._breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Site indisponible, nouvel essai dans {breaker.retry_after():.0f}s")
+
+        attempts = 1 + (self.max_retries if method == 'GET' else 0)
+        timeout = aiohttp.ClientTimeout(total=self.timeouts.get(endpoint, self.timeout.total),
+                                        connect=self.timeout.connect)
+        result = None
+        error = None
+
+        try:
+            for attempt in range(attempts):
+                if attempt:
+                    # Délai aléatoire (« full jitter ») pour ne pas synchroniser les nouvelles tentatives
+                    await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+                try:
+                    async with self._semaphore:
+                        async with session.request(method, url, headers=headers, json=json,
+                                                   timeout=timeout) as response:
+                            result = WebsiteResponse(response.status, await _read_body(response))
+                    error = None
+                    if result.status not in RETRYABLE_STATUSES:
+                        breaker.record_success()
+                        return result
+                    logger.debug("API %s %s: statut %s (tentative %s/%s)", method, endpoint, result.status, attempt + 1, attempts)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = WebsiteError(str(e) or "Délai dépassé")
+                    logger.debug("API %s %s: %s (tentative %s/%s)", method, endpoint, error, attempt + 1, attempts)
+        except asyncio.CancelledError:
+            breaker.release_trial()
+            raise
+        except Exception:
+            # Erreur inattendue (ex: corps illisible) : comptée comme un échec,
+            # sinon un appel d'essai laisserait le disjoncteur bloqué en half_open
+            breaker.record_failure()
+            raise
+
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return result
+
+    async def _cached(self, key: tuple, endpoint: str,
+                      fetch: Callable[[], Awaitable[WebsiteResponse]],
+                      use_cache: bool = True) -> WebsiteResponse:
+        """
+        Retourne la réponse en cache si elle existe, sinon appelle le site.
+
+        Une réponse périmée est servie immédiatement et rafraîchie en
+        arrière-plan. Seules les réponses 200 sont mises en cache ; avec
+        use_cache=False le site est toujours appelé et le cache mis à jour.
+        """
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                response, fresh = cached
+                if not fresh:
+                    self._refresh(key, endpoint, fetch)
+                return response
+
+        response = await self._single_flight(key, fetch)
+        if response.status == 200:
+            self.cache.set(key, endpoint, response)
+        return response
+
+    async def _single_flight(self, key: tuple, fetch: Callable[[], Awaitable[WebsiteResponse]]) -> WebsiteResponse:
+        """
+        Fusionne les appels identiques simultanés : le premier appelant lance
+        la requête, les suivants attendent son résultat (ou son erreur).
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget_inflight(key, done))
+        else:
+            self.coalesced += 1
+        # Un appelant annulé n'annule pas la requête partagée par les autres
+        return await asyncio.shield(task)
+
+    def _forget_inflight(self, key: tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Marque l'erreur comme lue si tous les appelants ont été annulés
+            task.exception()
+
+    def _refresh(self, key: tuple, endpoint: str, fetch: Callable[[], Awaitable[WebsiteResponse]]):
+        """Lance le rafraîchissement d'une entrée (un seul à la fois par clé)"""
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                response = await self._single_flight(key, fetch)
+                if response.status == 200:
+                    self.cache.set(key, endpoint, response)
+                else:
+                    logger.debug("Rafraîchissement du cache %s: statut %s", key, response.status)
+            except WebsiteError as e:
+                logger.debug("Rafraîchissement du cache %s impossible: %s", key, e)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def _api_headers(self) -> dict:
+        return {'Authorization': f'Bearer {self.api_key}'}
+
+    async def get_logs(self, limit: int, before: Optional[str] = None) -> WebsiteResponse:
+        """Logs du site, du plus récent au plus ancien, antérieurs au curseur `before`"""
+        query = {'limit': limit}
+        if before is not None:
+            query['before'] = before
+        url = str(URL(f"{self.base_url}/logs").with_query(query))
+        return await self._single_flight(
+            ('logs', limit, before),
+            lambda: self.request('GET', url, 'logs', self._api_headers())
+        )
+
+    async def get_stats(self, use_cache: bool = True) -> WebsiteResponse:
+        return await self._cached(
+            ('stats',), 'stats',
+            lambda: self.request('GET', f"{self.base_url}/stats", 'stats', self._api_headers()),
+            use_cache
+        )
+
+    async def get_user(self, user_id: int, use_cache: bool = True) -> WebsiteResponse:
+        return await self._cached(
+            ('users', user_id), 'users',
+            lambda: self.request('GET', f"{self.base_url}/users/{user_id}", 'users', self._api_headers()),
+            use_cache
+        )
+
+    def _register_headers(self) -> dict:
+        return {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.register_api_key}'
+        }
+
+    async def register_user(self, payload: dict) -> WebsiteResponse:
+        return await self.request('POST', self.register_url, 'register', self._register_headers(), payload)
+
+    async def register_users(self, payloads: list) -> WebsiteResponse:
+        """Enregistre plusieurs comptes en un appel (une transaction côté site)"""
+        return await self.request('POST', self.register_batch_url, 'register_batch',
+                                  self._register_headers(), {'users': payloads})
+
+
+def parse_log_page(data, limit: int) -> LogPage:
+    """
+    Interprète une réponse de /logs.
+
+    Accepte {"logs": [...], "next_cursor": ...} ou une simple liste : le
+    curseur est alors l'id (à défaut l'horodatage) de la dernière entrée, et
+    une page incomplète signifie qu'il n'y a plus d'entrées plus anciennes.
+    """
+    if isinstance(data, dict):
+        entries = data.get('logs') or data.get('items') or []
+        cursor = data.get('next_cursor', data.get('nextCursor'))
+        return LogPage(entries, str(cursor) if cursor is not None else None)
+
+    entries = data if isinstance(data, list) else []
+    if len(entries) < limit or not isinstance(entries[-1], dict):
+        return LogPage(entries, None)
+    cursor = entries[-1].get('id', entries[-1].get('timestamp'))
+    return LogPage(entries, str(cursor) if cursor is not None else None)
+
+
+async def _read_body(response: aiohttp.ClientResponse):
+    """Décode le corps en JSON, ou retourne le texte brut s'il n'est pas du JSON"""
+    text = await response.text()
+    try:
+        return json_module.loads(text)
+    except ValueError:
+        return text